@@ -1,16 +1,115 @@
-from django.contrib import admin
+from urllib.parse import urlencode
+
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .deletion import delete_recipes, schedule_user_deletion
 from .models import (
     User, Ingredient, Recipe, RecipeIngredient,
-    Follow,
+    Follow, IngredientNutrition, MealPlanEntry, OutboxCheckpoint,
+    OutboxEvent, Favorite, ShoppingCartItem, Tag, RecipeTag, Job,
+)
+from .nutrition import (
+    recompute_ingredient_recipes,
+    recompute_recipe_nutrition,
+)
+
+ESTIMATED_COUNT_THRESHOLD = 100_000
+SCHEDULED_DELETION_MESSAGE = (
+    "Аккаунты {users} отключены и будут удалены в фоне"
 )
 
 
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+
+        if queryset.query.where or connection.vendor != "postgresql":
+            return super().count
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE relname = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        if row is None or row[0] < ESTIMATED_COUNT_THRESHOLD:
+            return super().count
+        return int(row[0])
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class InputFilter(admin.SimpleListFilter):
+    template = "admin/input_filter.html"
+    placeholder = ""
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.preserved_params = {
+            key: value for key, value in request.GET.items()
+            if key not in (self.parameter_name, "p")
+        }
+        self.reset_query_string = "?" + urlencode(self.preserved_params)
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def choices(self, changelist):
+        return ()
+
+
+class UserInputFilter(InputFilter):
+    placeholder = "id, username или email"
+
+    @classmethod
+    def on(cls, field_name, title):
+        return type(f"{field_name.title()}InputFilter", (cls,), {
+            "title": title,
+            "parameter_name": field_name,
+        })
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        if not value:
+            return queryset
+
+        field_name = self.parameter_name
+        lookup = Q(**{f"{field_name}__username": value})
+        lookup |= Q(**{f"{field_name}__email": value})
+        if value.isdigit():
+            lookup |= Q(**{f"{field_name}_id": int(value)})
+        return queryset.filter(lookup)
+
+
+class IngredientNutritionInline(admin.StackedInline):
+    model = IngredientNutrition
+
+
 @admin.register(Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "measurement_unit")
     search_fields = ("name",)
     list_filter = ("measurement_unit",)
+    inlines = [IngredientNutritionInline]
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        if change:
+            recompute_ingredient_recipes([form.instance.pk])
 
 
 class RecipeIngredientInline(admin.TabularInline):
@@ -19,24 +118,58 @@ class RecipeIngredientInline(admin.TabularInline):
     autocomplete_fields = ("ingredient",)
 
 
+class RecipeTagInline(admin.TabularInline):
+    model = RecipeTag
+    extra = 1
+    autocomplete_fields = ("tag",)
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "slug")
+    search_fields = ("name", "slug")
+    prepopulated_fields = {"slug": ("name",)}
+
+
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(LargeTableAdmin, BaseUserAdmin):
     list_display = (
         "id", "username", "email", "first_name", "last_name", "is_staff"
     )
     search_fields = ("email", "username", "first_name", "last_name",)
     list_filter = ("is_staff", "is_superuser", "is_active")
 
+    def delete_model(self, request, obj):
+        if schedule_user_deletion(obj):
+            self.message_user(request, SCHEDULED_DELETION_MESSAGE.format(
+                users=obj
+            ), messages.WARNING)
+
+    def delete_queryset(self, request, queryset):
+        scheduled = [
+            str(user) for user in queryset if schedule_user_deletion(user)
+        ]
+        if scheduled:
+            self.message_user(request, SCHEDULED_DELETION_MESSAGE.format(
+                users=", ".join(scheduled)
+            ), messages.WARNING)
+
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(LargeTableAdmin):
     list_display = ("id", "user", "author", "created_at")
+    list_select_related = ("user", "author")
     search_fields = ("user__username", "author__username")
-    list_filter = ("created_at",)
+    list_filter = (
+        UserInputFilter.on("user", "подписчику"),
+        UserInputFilter.on("author", "автору"),
+        "created_at",
+    )
+    autocomplete_fields = ("user", "author")
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(LargeTableAdmin):
     list_display = (
         "id",
         "name",
@@ -44,6 +177,92 @@ class RecipeAdmin(admin.ModelAdmin):
         "cooking_time",
         "pub_date",
     )
+    list_select_related = ("author",)
     search_fields = ("name",)
-    list_filter = ("author", "name", "pub_date")
-    inlines = [RecipeIngredientInline]
+    list_filter = (
+        UserInputFilter.on("author", "автору"), "time_bucket", "pub_date",
+    )
+    autocomplete_fields = ("author",)
+    inlines = [RecipeIngredientInline, RecipeTagInline]
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        recompute_recipe_nutrition([form.instance.pk])
+
+    def delete_model(self, request, obj):
+        delete_recipes(self.model.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_recipes(queryset)
+
+
+@admin.register(Favorite, ShoppingCartItem)
+class UserRecipeAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "recipe", "created_at")
+    list_select_related = ("user", "recipe")
+    list_filter = (UserInputFilter.on("user", "пользователю"), "created_at")
+    autocomplete_fields = ("user", "recipe")
+
+
+@admin.register(MealPlanEntry)
+class MealPlanEntryAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "date", "recipe", "servings")
+    list_select_related = ("user", "recipe")
+    list_filter = (UserInputFilter.on("user", "пользователю"), "date")
+    autocomplete_fields = ("user", "recipe")
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(LargeTableAdmin):
+    list_display = ("id", "event_type", "user_id", "object_id", "created_at")
+    list_filter = ("event_type", "created_at")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboxCheckpoint)
+class OutboxCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("consumer", "position", "updated_at")
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = (
+        "id", "name", "state", "progress_display", "attempts",
+        "run_at", "started_at", "finished_at", "worker",
+    )
+    list_filter = ("state", "name")
+    readonly_fields = [field.name for field in Job._meta.fields]
+    actions = ("retry_jobs", "cancel_jobs")
+
+    @admin.display(description="Прогресс")
+    def progress_display(self, obj):
+        if obj.total:
+            return f"{obj.progress} / {obj.total}"
+        return obj.progress or "—"
+
+    @admin.action(description="Перезапустить выбранные задачи")
+    def retry_jobs(self, request, queryset):
+        updated = queryset.filter(state=Job.FAILED).update(
+            state=Job.QUEUED,
+            max_attempts=F("attempts") + 1,
+            run_at=timezone.now(),
+            finished_at=None,
+        )
+        self.message_user(request, f"Перезапущено задач: {updated}")
+
+    @admin.action(description="Отменить выбранные задачи")
+    def cancel_jobs(self, request, queryset):
+        updated = queryset.filter(state=Job.QUEUED).update(
+            state=Job.FAILED,
+            error="Отменена администратором",
+            finished_at=timezone.now(),
+        )
+        self.message_user(request, f"Отменено задач: {updated}")
+
+    def has_add_permission(self, request):
+        return False
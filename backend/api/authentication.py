@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+TOKEN_CACHE_PREFIX = "auth:token:"
+
+
+def token_cache_key(key):
+    return f"{TOKEN_CACHE_PREFIX}{key}"
+
+
+def invalidate_tokens(*keys):
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+def invalidate_user_tokens(user_id):
+    invalidate_tokens(
+        *Token.objects.filter(user_id=user_id).values_list("key", flat=True)
+    )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        if not settings.SHARED_CACHE:
+            return super().authenticate_credentials(key)
+
+        cache_key = token_cache_key(key)
+        user = cache.get(cache_key)
+
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, user, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+            return user, token
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                "User inactive or deleted."
+            )
+
+        return user, Token(key=key, user=user)
@@ -0,0 +1,99 @@
+import gzip
+import os
+import time
+from pathlib import Path
+
+import brotli
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Ingredient
+from .renderers import FastJSONRenderer
+from .serializers import IngredientSerializer
+
+CATALOG_VERSION_KEY = "ingredients:catalog:version"
+
+SNAPSHOT_NAME = "ingredients.json"
+SNAPSHOT_VERSION_NAME = "ingredients.version"
+SNAPSHOT_ENCODINGS = {
+    "br": (".br", lambda content: brotli.compress(content, quality=11)),
+    "gzip": (".gz", lambda content: gzip.compress(content, 9, mtime=0)),
+    "identity": ("", lambda content: content),
+}
+
+_built_version = None
+
+
+def get_catalog_version():
+    return cache.get_or_set(CATALOG_VERSION_KEY, time.time, None)
+
+
+def bump_catalog_version():
+    version = time.time()
+    cache.set(CATALOG_VERSION_KEY, version, None)
+    return version
+
+
+def snapshot_path(encoding="identity"):
+    suffix, _ = SNAPSHOT_ENCODINGS[encoding]
+    root = Path(settings.INGREDIENTS_SNAPSHOT_ROOT)
+    return root / f"{SNAPSHOT_NAME}{suffix}"
+
+
+def _write_atomic(path, content):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+def build_catalog_snapshot(version=None):
+    global _built_version
+
+    if version is None:
+        version = get_catalog_version()
+
+    content = FastJSONRenderer().render(
+        IngredientSerializer(Ingredient.objects.all(), many=True).data
+    )
+
+    root = Path(settings.INGREDIENTS_SNAPSHOT_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    for encoding, (_, compress) in SNAPSHOT_ENCODINGS.items():
+        _write_atomic(snapshot_path(encoding), compress(content))
+    _write_atomic(root / SNAPSHOT_VERSION_NAME, str(version).encode())
+
+    _built_version = version
+    return version
+
+
+def refresh_catalog_snapshot():
+    return build_catalog_snapshot(bump_catalog_version())
+
+
+def schedule_catalog_refresh():
+    # Bulk changes send a signal per row; rebuild once after the commit.
+    pending = transaction.get_connection().run_on_commit
+    if not any(func is refresh_catalog_snapshot for _, func, *_ in pending):
+        transaction.on_commit(refresh_catalog_snapshot)
+
+
+def ensure_catalog_snapshot():
+    global _built_version
+
+    version = get_catalog_version()
+    if _built_version == version:
+        return version
+
+    root = Path(settings.INGREDIENTS_SNAPSHOT_ROOT)
+    version_path = root / SNAPSHOT_VERSION_NAME
+    try:
+        built = version_path.read_text()
+    except FileNotFoundError:
+        built = None
+
+    if built != str(version):
+        return build_catalog_snapshot(version)
+
+    _built_version = version
+    return version
@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.deletion import get_candidate_relations_to_delete
+from django.db.models.signals import post_delete, pre_delete
+
+from .jobs import enqueue
+from .models import (
+    Favorite,
+    Follow,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCartItem,
+    User,
+)
+
+
+def _raw_delete(queryset):
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_files_later(names):
+    names = [name for name in names if name]
+    if names:
+        enqueue("release_files", names=names)
+
+
+def _can_delete_in_db(model, path):
+    if model in path:
+        return False
+    if pre_delete.has_listeners(model) or post_delete.has_listeners(model):
+        return False
+    return all(
+        relation.on_delete is models.CASCADE
+        for relation in get_candidate_relations_to_delete(model._meta)
+    )
+
+
+def cascade_delete(queryset, path=()):
+    model = queryset.model
+    if not _can_delete_in_db(model, path):
+        queryset.delete()
+        return
+
+    ids = queryset.values("pk")
+    for relation in get_candidate_relations_to_delete(model._meta):
+        related = relation.related_model._base_manager.filter(
+            **{f"{relation.field.name}__in": ids}
+        )
+        cascade_delete(related, (*path, model))
+
+    _raw_delete(queryset)
+
+
+@transaction.atomic
+def delete_recipes(recipes):
+    # The filter is a subquery, so it must not depend on cascaded rows.
+    recipes = Recipe.objects.filter(pk__in=recipes.values("pk"))
+    images = list(recipes.values_list("image", flat=True).iterator())
+
+    cascade_delete(recipes)
+
+    delete_files_later(images)
+
+
+def count_user_relations(user):
+    return sum((
+        Favorite.objects.filter(user=user).count(),
+        ShoppingCartItem.objects.filter(user=user).count(),
+        Follow.objects.filter(Q(user=user) | Q(author=user)).count(),
+        RecipeIngredient.objects.filter(recipe__author=user).count(),
+    ))
+
+
+@transaction.atomic
+def delete_user(user):
+    recipes = Recipe.objects.filter(author=user)
+    files = list(recipes.values_list("image", flat=True))
+    if files:
+        # The collector would load and batch the recipe ids, so the
+        # recipes are removed with subqueries before the user.
+        cascade_delete(recipes)
+    files.append(user.avatar.name if user.avatar else None)
+
+    cascade_delete(User.objects.filter(pk=user.pk))
+
+    delete_files_later(files)
+
+
+def schedule_user_deletion(user):
+    if count_user_relations(user) < settings.BACKGROUND_DELETE_THRESHOLD:
+        delete_user(user)
+        return False
+
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+        enqueue("delete_user", user_id=user.pk)
+    return True
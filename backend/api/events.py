@@ -0,0 +1,123 @@
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import OutboxCheckpoint, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONSUMER = "default"
+
+HANDLERS = defaultdict(list)
+
+
+def handles(*event_types):
+    def register(handler):
+        for event_type in event_types or (None,):
+            HANDLERS[event_type].append(handler)
+        return handler
+
+    return register
+
+
+def record(event_type, user_id, object_id, **payload):
+    if not transaction.get_connection().in_atomic_block:
+        raise RuntimeError(
+            "События нужно записывать в одной транзакции с изменением"
+        )
+    return OutboxEvent.objects.create(
+        event_type=event_type,
+        user_id=user_id,
+        object_id=object_id,
+        payload=payload,
+    )
+
+
+def dispatch(events):
+    by_type = defaultdict(list)
+    for event in events:
+        by_type[event.event_type].append(event)
+
+    for event_type, batch in by_type.items():
+        for handler in HANDLERS[event_type]:
+            handler(batch)
+    for handler in HANDLERS[None]:
+        handler(events)
+
+
+def consume(consumer=DEFAULT_CONSUMER, batch_size=None):
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    now = time.time()
+
+    with transaction.atomic():
+        checkpoint, _ = (
+            OutboxCheckpoint.objects.select_for_update()
+            .get_or_create(consumer=consumer)
+        )
+        # Ids are assigned before commit, so a slow transaction can make an
+        # older id visible after a newer one. Ids the checkpoint passes are
+        # kept as gaps and looked up again until OUTBOX_GAP_TIMEOUT, after
+        # which they are taken for rolled back inserts.
+        gaps = {int(pk): seen for pk, seen in checkpoint.gaps.items()}
+        late = list(OutboxEvent.objects.filter(id__in=gaps).order_by("id"))
+        events = list(
+            OutboxEvent.objects.filter(
+                id__gt=checkpoint.position
+            ).order_by("id")[:batch_size]
+        )
+        for event in late:
+            del gaps[event.id]
+        if events and checkpoint.position:
+            found = {event.id for event in events}
+            gaps.update(
+                (pk, now)
+                for pk in range(checkpoint.position + 1, events[-1].id)
+                if pk not in found
+            )
+        expired = [
+            pk for pk, seen in gaps.items()
+            if seen < now - settings.OUTBOX_GAP_TIMEOUT
+        ]
+        for pk in expired:
+            del gaps[pk]
+        if not late and not events and not expired:
+            return 0
+
+        if late or events:
+            dispatch(late + events)
+        if events:
+            checkpoint.position = events[-1].id
+        checkpoint.gaps = gaps
+        checkpoint.save(update_fields=["position", "gaps", "updated_at"])
+
+    return len(late) + len(events)
+
+
+def prune_events(retention_days=None):
+    retention_days = retention_days or settings.OUTBOX_RETENTION_DAYS
+    position = OutboxCheckpoint.objects.aggregate(
+        position=Min("position")
+    )["position"]
+    if position is None:
+        return 0
+
+    deleted, _ = OutboxEvent.objects.filter(
+        id__lte=position,
+        created_at__lt=timezone.now() - timedelta(days=retention_days),
+    ).delete()
+    return deleted
+
+
+@handles()
+def log_events(events):
+    for event in events:
+        logger.info(
+            "%s user=%s object=%s", event.event_type,
+            event.user_id, event.object_id,
+        )
@@ -0,0 +1,220 @@
+import json
+import posixpath
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import (
+    DataExport,
+    Favorite,
+    Follow,
+    Job,
+    MealPlanEntry,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCartItem,
+    User,
+)
+from .storage import export_storage
+
+CHUNK_SIZE = 2_000
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+
+class ZipStream:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+def export_tables(user):
+    return {
+        "profile.ndjson": User.objects.filter(pk=user.pk).values(
+            "id", "username", "email", "first_name", "last_name",
+            "avatar", "date_joined",
+        ),
+        "recipes.ndjson": Recipe.objects.filter(author=user).values(
+            "id", "name", "text", "cooking_time", "image",
+            "pub_date", "updated_at",
+        ).order_by("id"),
+        "recipe_ingredients.ndjson": RecipeIngredient.objects.filter(
+            recipe__author=user
+        ).values(
+            "recipe_id", "ingredient__name",
+            "ingredient__measurement_unit", "amount",
+        ).order_by("recipe_id", "id"),
+        "favorites.ndjson": Favorite.objects.filter(
+            user=user
+        ).values(
+            "recipe_id", "recipe__name", "created_at"
+        ).order_by("id"),
+        "shopping_cart.ndjson": ShoppingCartItem.objects.filter(
+            user=user
+        ).values(
+            "recipe_id", "recipe__name", "created_at"
+        ).order_by("id"),
+        "follows.ndjson": Follow.objects.filter(user=user).values(
+            "author_id", "author__username", "created_at",
+        ).order_by("id"),
+        "meal_plan.ndjson": MealPlanEntry.objects.filter(user=user).values(
+            "date", "recipe_id", "recipe__name", "servings",
+        ).order_by("date", "id"),
+    }
+
+
+def export_files(user):
+    if user.avatar:
+        yield user.avatar.name
+    yield from (
+        Recipe.objects.filter(author=user).exclude(image="")
+        .values_list("image", flat=True).distinct()
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def count_export_rows(user):
+    return sum(rows.count() for rows in export_tables(user).values())
+
+
+def is_small_export(user):
+    if count_export_rows(user) >= settings.EXPORT_ASYNC_THRESHOLD:
+        return False
+
+    size = 0
+    for name in export_files(user):
+        try:
+            size += default_storage.size(name)
+        except OSError:
+            continue
+        if size >= settings.EXPORT_ASYNC_MEDIA_SIZE:
+            return False
+    return True
+
+
+def zip_entry(name, date_time, compress_type=zipfile.ZIP_DEFLATED):
+    info = zipfile.ZipInfo(name, date_time=date_time)
+    info.compress_type = compress_type
+    return info
+
+
+def stream_export(user):
+    stream = ZipStream()
+    date_time = timezone.localtime().timetuple()[:6]
+    with zipfile.ZipFile(stream, "w") as archive:
+        for name, rows in export_tables(user).items():
+            with archive.open(
+                zip_entry(name, date_time), "w", force_zip64=True
+            ) as entry:
+                for row in rows.iterator(chunk_size=CHUNK_SIZE):
+                    entry.write(json.dumps(
+                        row, cls=DjangoJSONEncoder, ensure_ascii=False
+                    ).encode() + b"\n")
+                    yield from stream.drain()
+
+        for name in export_files(user):
+            if not default_storage.exists(name):
+                continue
+            # Images are already compressed, store them as is.
+            info = zip_entry(
+                posixpath.join("media", name), date_time, zipfile.ZIP_STORED
+            )
+            with default_storage.open(name) as source, archive.open(
+                info, "w", force_zip64=True
+            ) as entry:
+                for chunk in source.chunks():
+                    entry.write(chunk)
+                    yield from stream.drain()
+
+    yield from stream.drain()
+
+
+def export_filename(user):
+    return f"foodgram-{user.pk}.zip"
+
+
+def export_status(export):
+    if export is None:
+        return None
+    if export.archive:
+        expires = export.finished_at + timedelta(
+            seconds=settings.EXPORT_RETENTION
+        )
+        if expires > timezone.now() and export_storage.exists(export.archive):
+            return READY
+        return None
+
+    state = Job.objects.filter(pk=export.job_id).values_list(
+        "state", flat=True
+    ).first()
+    return PENDING if state in (Job.QUEUED, Job.RUNNING) else FAILED
+
+
+def ready_export(user):
+    export = DataExport.objects.filter(user=user).first()
+    return export.archive if export_status(export) == READY else None
+
+
+def build_export(user_id):
+    user = User.objects.get(pk=user_id)
+    with tempfile.TemporaryFile() as archive:
+        for chunk in stream_export(user):
+            archive.write(chunk)
+        archive.seek(0)
+        name = export_storage.save(f"{user.pk}.zip", File(archive))
+
+    previous = DataExport.objects.filter(user=user).values_list(
+        "archive", flat=True
+    ).first()
+    DataExport.objects.filter(user=user).update(
+        archive=name, finished_at=timezone.now()
+    )
+    if previous and previous != name:
+        export_storage.delete(previous)
+
+
+def schedule_export(user):
+    DataExport.objects.get_or_create(user=user)
+    with transaction.atomic():
+        export = DataExport.objects.select_for_update().get(user=user)
+        status = export_status(export)
+        if status in (PENDING, READY):
+            return status
+
+        # The job row commits together with the export, so a worker
+        # cannot pick it up before the export points at it.
+        export.job = enqueue("build_export", user_id=user.pk)
+        export.archive = ""
+        export.requested_at = timezone.now()
+        export.finished_at = None
+        export.save()
+    return PENDING
+
+
+def expired_exports(now):
+    if not export_storage.exists(""):
+        return
+    _, files = export_storage.listdir("")
+    for name in files:
+        modified = export_storage.get_modified_time(name).timestamp()
+        if now - modified > settings.EXPORT_RETENTION:
+            yield name
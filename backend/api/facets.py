@@ -0,0 +1,147 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import (
+    COOKING_TIME_BUCKETS,
+    Favorite,
+    Ingredient,
+    ShoppingCartItem,
+    Tag,
+    User,
+)
+
+FACET_LIMIT = 20
+DEFAULT_FACETS = ("tags",)
+UNCACHED_PARAMS = ("page", "limit", "ordering", "fields", "facets")
+
+
+def tag_facets(queryset):
+    return list(
+        Tag.objects.filter(recipe_tags__recipe__in=queryset.values("pk"))
+        .values("id", "name", "slug")
+        .annotate(count=Count("recipe_tags"))
+        .order_by("name")
+    )
+
+
+def author_facets(queryset):
+    return list(
+        User.objects.filter(recipes__in=queryset.values("pk"))
+        .values("id", "username")
+        .annotate(count=Count("recipes"))
+        .order_by("-count", "username")[:FACET_LIMIT]
+    )
+
+
+def ingredient_facets(queryset):
+    return list(
+        Ingredient.objects.filter(
+            ingredient_recipes__recipe__in=queryset.values("pk")
+        )
+        .values("id", "name", "measurement_unit")
+        .annotate(count=Count("ingredient_recipes"))
+        .order_by("-count", "name")[:FACET_LIMIT]
+    )
+
+
+def cooking_time_facets(queryset):
+    counts = dict(
+        queryset.order_by().values("time_bucket")
+        .annotate(count=Count("pk"))
+        .values_list("time_bucket", "count")
+    )
+    return [
+        {"value": name, "count": counts.get(name, 0)}
+        for name, _ in COOKING_TIME_BUCKETS
+    ]
+
+
+GROUPED_FACETS = {
+    "author": author_facets,
+    "cooking_time": cooking_time_facets,
+    "ingredients": ingredient_facets,
+    "tags": tag_facets,
+}
+
+FLAG_FACETS = {
+    "is_favorited": Favorite,
+    "is_in_shopping_cart": ShoppingCartItem,
+}
+
+FACET_NAMES = (*GROUPED_FACETS, *FLAG_FACETS)
+
+
+def parse_facet_names(value):
+    if value is None:
+        return DEFAULT_FACETS
+
+    names = tuple(dict.fromkeys(
+        name.strip() for name in value.split(",") if name.strip()
+    ))
+    unknown = [name for name in names if name not in FACET_NAMES]
+    if unknown:
+        raise ValueError(
+            f"Неизвестные фасеты: {', '.join(unknown)}. "
+            f"Доступны: {', '.join(FACET_NAMES)}"
+        )
+    return names
+
+
+def flag_facets(queryset, names, user, total):
+    counts = {}
+    if user and user.is_authenticated:
+        counts = queryset.order_by().aggregate(**{
+            name: Count("pk", filter=Q(
+                pk__in=FLAG_FACETS[name].objects.filter(
+                    user=user
+                ).values("recipe_id")
+            ))
+            for name in names
+        })
+
+    return {
+        name: [
+            {"value": 1, "count": counts.get(name, 0)},
+            {"value": 0, "count": total - counts.get(name, 0)},
+        ]
+        for name in names
+    }
+
+
+def compute_facets(queryset, names, user, total):
+    facets = flag_facets(
+        queryset, [name for name in names if name in FLAG_FACETS],
+        user, total,
+    )
+    for name in names:
+        if name in GROUPED_FACETS:
+            facets[name] = GROUPED_FACETS[name](queryset)
+    return {name: facets[name] for name in names}
+
+
+def facets_cache_key(names, params, stamp):
+    filters = sorted(
+        (key, sorted(values)) for key, values in params
+        if key not in UNCACHED_PARAMS
+    )
+    digest = hashlib.md5(
+        repr((names, filters, stamp)).encode()
+    ).hexdigest()
+    return f"recipe-facets-{digest}"
+
+
+def get_facets(queryset, names, user, total, params, stamp):
+    if not names:
+        return {}
+    if user and user.is_authenticated or stamp is None:
+        return compute_facets(queryset, names, user, total)
+
+    key = facets_cache_key(names, params, stamp)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset, names, user, total)
+        cache.set(key, facets, settings.FACETS_CACHE_TIMEOUT)
+    return facets
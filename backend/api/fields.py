@@ -0,0 +1,100 @@
+import base64
+import binascii
+import uuid
+import warnings
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from drf_extra_fields.fields import Base64FieldMixin, Base64ImageField
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+DECODE_CHUNK_SIZE = 64 * 1024
+BASE64_HEADER_SEPARATOR = ";base64,"
+MAX_HEADER_LENGTH = 256
+
+Image.MAX_IMAGE_PIXELS = settings.MAX_IMAGE_PIXELS
+
+
+class BoundedBase64ImageField(Base64ImageField):
+    TOO_LARGE_MESSAGE = "Размер изображения не должен превышать {size} МБ"
+    TOO_MANY_PIXELS_MESSAGE = (
+        "Изображение не должно содержать больше {pixels} пикселей"
+    )
+
+    def to_internal_value(self, base64_data):
+        if base64_data in self.EMPTY_VALUES:
+            return None
+        if not isinstance(base64_data, str):
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+
+        start = base64_data.find(
+            BASE64_HEADER_SEPARATOR, 0, MAX_HEADER_LENGTH
+        )
+        start = 0 if start == -1 else start + len(BASE64_HEADER_SEPARATOR)
+        self.check_size(base64_data, start)
+
+        upload = TemporaryUploadedFile(
+            f"{uuid.uuid4()}.tmp", None, 0, None
+        )
+        try:
+            upload.size = self.decode(base64_data, start, upload)
+            upload.name, upload.content_type = self.inspect(upload)
+            return super(Base64FieldMixin, self).to_internal_value(upload)
+        except BaseException:
+            upload.close()
+            raise
+
+    def check_size(self, base64_data, start):
+        # Whitespace only adds to the length, so this bound is safe.
+        padding = base64_data[-4:].count("=")
+        size = (len(base64_data) - start) * 3 // 4 - padding
+        if size > settings.MAX_UPLOAD_SIZE:
+            raise ValidationError(self.TOO_LARGE_MESSAGE.format(
+                size=settings.MAX_UPLOAD_SIZE // (1024 * 1024)
+            ))
+
+    def decode(self, base64_data, start, destination):
+        size = 0
+        remainder = ""
+        try:
+            for offset in range(start, len(base64_data), DECODE_CHUNK_SIZE):
+                # Encoders often wrap lines; whitespace is dropped and the
+                # tail that does not fill a four-character group carried.
+                text = remainder + "".join(
+                    base64_data[offset:offset + DECODE_CHUNK_SIZE].split()
+                )
+                aligned = len(text) - len(text) % 4
+                remainder = text[aligned:]
+                chunk = base64.b64decode(text[:aligned], validate=True)
+                destination.write(chunk)
+                size += len(chunk)
+        except (binascii.Error, ValueError):
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+        if remainder:
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+        destination.seek(0)
+        return size
+
+    def inspect(self, upload):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+                with Image.open(upload) as image:
+                    width, height = image.size
+                    image_format = image.format
+        except (OSError, Image.DecompressionBombError):
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+        finally:
+            upload.seek(0)
+
+        if width * height > settings.MAX_IMAGE_PIXELS:
+            raise ValidationError(self.TOO_MANY_PIXELS_MESSAGE.format(
+                pixels=settings.MAX_IMAGE_PIXELS
+            ))
+
+        extension = image_format.lower()
+        extension = "jpg" if extension == "jpeg" else extension
+        if extension not in self.ALLOWED_TYPES:
+            raise ValidationError(self.INVALID_TYPE_MESSAGE)
+        return f"{uuid.uuid4()}.{extension}", Image.MIME.get(image_format)
@@ -0,0 +1,118 @@
+from rest_framework import permissions
+from rest_framework.serializers import ListSerializer
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+UNSET = object()
+
+
+def _split(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class Fieldset:
+    def __init__(self, fields, expand=()):
+        self.fields = fields
+        self.expand = frozenset(expand)
+
+    @classmethod
+    def parse(cls, fields, expand=""):
+        tree = {}
+        for path in _split(fields):
+            node = tree
+            *parents, leaf = path.split(".")
+            for name in parents:
+                if node.get(name) is None:
+                    node[name] = {}
+                node = node[name]
+            node.setdefault(leaf, None)
+
+        return cls._from_tree(tree, _split(expand))
+
+    @classmethod
+    def _from_tree(cls, tree, expand=()):
+        return cls(
+            {
+                name: None if subtree is None else cls._from_tree(subtree)
+                for name, subtree in tree.items()
+            },
+            expand,
+        )
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None
+
+        fields = request.query_params.get(FIELDS_PARAM)
+        if not fields:
+            return None
+
+        return cls.parse(fields, request.query_params.get(EXPAND_PARAM, ""))
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def is_collapsed(self, name):
+        return (name in self.fields and self.fields[name] is None
+                and name not in self.expand)
+
+    def nested(self, name):
+        return self.fields.get(name)
+
+    def only_fields(self, model, *required):
+        columns = {field.name for field in model._meta.concrete_fields}
+        selected = [name for name in self.fields if name in columns]
+        return list(dict.fromkeys([*required, *selected]))
+
+
+def selects(fieldset, name):
+    return fieldset is None or name in fieldset
+
+
+def collapses(fieldset, name):
+    return fieldset is not None and fieldset.is_collapsed(name)
+
+
+def nested_fieldset(fieldset, name):
+    return None if fieldset is None else fieldset.nested(name)
+
+
+class SparseFieldsetMixin:
+    collapsed_fields = {}
+
+    def __init__(self, *args, fieldset=UNSET, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fieldset is not UNSET:
+            self._fieldset = fieldset
+
+    def get_fieldset(self):
+        if not hasattr(self, "_fieldset"):
+            parent = self.parent
+            if isinstance(parent, ListSerializer):
+                parent = parent.parent
+            self._fieldset = (
+                Fieldset.from_request(self.context.get("request"))
+                if parent is None else None
+            )
+        return self._fieldset
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.get_fieldset()
+
+        if fieldset is None:
+            return fields
+
+        for name, field in list(fields.items()):
+            if field.write_only:
+                continue
+            if name not in fieldset:
+                del fields[name]
+            elif name in self.collapsed_fields and fieldset.is_collapsed(name):
+                fields[name] = self.collapsed_fields[name]()
+            elif isinstance(field, SparseFieldsetMixin):
+                field._fieldset = fieldset.nested(name)
+
+        return fields
@@ -1,9 +1,50 @@
 import django_filters
+from django import forms
+from django.core.validators import validate_slug
+from django.db.models import Count
+from rest_framework.filters import OrderingFilter
+
 from .models import (
+    COOKING_TIME_BUCKETS,
     Recipe,
+    RecipeTag,
     Ingredient,
+    MealPlanEntry,
 )
 
+TAGS_MATCH_ANY = "any"
+TAGS_MATCH_ALL = "all"
+
+
+class SlugListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        slugs = list(dict.fromkeys(value or ()))
+        for slug in slugs:
+            validate_slug(slug)
+        return slugs
+
+
+class SlugListFilter(django_filters.Filter):
+    field_class = SlugListField
+
+
+class RecipeOrderingFilter(OrderingFilter):
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+
+        fields = {field.lstrip("-") for field in ordering}
+        reverse = ordering[0].startswith("-")
+        tiebreaker = [
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in queryset.model._meta.ordering
+        ] if reverse else queryset.model._meta.ordering
+        return [*ordering, *(field for field in tiebreaker
+                             if field.lstrip("-") not in fields)]
+
 
 class RecipeFilter(django_filters.FilterSet):
     author = django_filters.NumberFilter(
@@ -18,14 +59,33 @@ class RecipeFilter(django_filters.FilterSet):
         method="filter_is_favorited"
     )
 
+    cooking_time__gte = django_filters.NumberFilter(
+        field_name="cooking_time", lookup_expr="gte"
+    )
+
+    cooking_time__lte = django_filters.NumberFilter(
+        field_name="cooking_time", lookup_expr="lte"
+    )
+
+    time_bucket = django_filters.MultipleChoiceFilter(
+        choices=[(name, name) for name, _ in COOKING_TIME_BUCKETS]
+    )
+
+    tags = SlugListFilter(method="filter_tags")
+
+    tags_match = django_filters.ChoiceFilter(
+        choices=((TAGS_MATCH_ANY, TAGS_MATCH_ANY),
+                 (TAGS_MATCH_ALL, TAGS_MATCH_ALL)),
+        method="filter_tags_match",
+    )
+
     class Meta:
         model = Recipe
-        fields = ["author", "is_favorited", "is_in_shopping_cart"]
+        fields = ["author", "is_favorited", "is_in_shopping_cart", "tags"]
 
     def filter_in_cart(self, queryset, _, value):
         user = self.request.user
         has_auth = user and user.is_authenticated
-        print(has_auth, value, '===============')
         if has_auth:
             return (queryset.filter(in_shopping_cart_for_users=user) if value
                     else queryset.exclude(in_shopping_cart_for_users=user))
@@ -42,6 +102,17 @@ class RecipeFilter(django_filters.FilterSet):
         else:
             return queryset.none() if value else queryset
 
+    def filter_tags(self, queryset, _, slugs):
+        recipe_tags = RecipeTag.objects.filter(tag__slug__in=slugs)
+        if self.form.cleaned_data.get("tags_match") == TAGS_MATCH_ALL:
+            recipe_tags = recipe_tags.values("recipe_id").annotate(
+                matched=Count("tag_id")
+            ).filter(matched=len(slugs))
+        return queryset.filter(pk__in=recipe_tags.values("recipe_id"))
+
+    def filter_tags_match(self, queryset, *_):
+        return queryset
+
 
 class IngredientFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(lookup_expr='istartswith')
@@ -49,3 +120,11 @@ class IngredientFilter(django_filters.FilterSet):
     class Meta:
         model = Ingredient
         fields = ['name']
+
+
+class MealPlanFilter(django_filters.FilterSet):
+    date = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = MealPlanEntry
+        fields = ["date"]
@@ -0,0 +1,245 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+Task = namedtuple("Task", ("func", "max_attempts"))
+
+TASKS = {}
+
+
+def task(name, max_attempts=None):
+    def register(func):
+        TASKS[name] = Task(func, max_attempts)
+        return func
+
+    return register
+
+
+def enqueue(name, delay=0, **payload):
+    if name not in TASKS:
+        raise LookupError(f"Неизвестная задача: {name}")
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=TASKS[name].max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def report_progress(job, progress, total=None):
+    job.progress = progress
+    job.heartbeat_at = timezone.now()
+    fields = {"progress": progress, "heartbeat_at": job.heartbeat_at}
+    if total is not None:
+        job.total = fields["total"] = total
+    Job.objects.filter(pk=job.pk).update(**fields)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker):
+    while True:
+        with transaction.atomic():
+            job = (
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(state=Job.QUEUED, run_at__lte=timezone.now())
+                .order_by("run_at", "id").first()
+            )
+            if job is None:
+                return None
+
+            now = timezone.now()
+            # Backends without row locks let two workers read the same
+            # row, so only the one whose update still sees it queued wins.
+            claimed = Job.objects.filter(
+                pk=job.pk, state=Job.QUEUED
+            ).update(
+                state=Job.RUNNING,
+                attempts=F("attempts") + 1,
+                worker=worker,
+                started_at=now,
+                heartbeat_at=now,
+            )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+class Heartbeat(threading.Thread):
+    def __init__(self, job_id, worker):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.worker = worker
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(settings.JOB_HEARTBEAT_INTERVAL):
+                try:
+                    Job.objects.filter(
+                        pk=self.job_id, state=Job.RUNNING, worker=self.worker
+                    ).update(heartbeat_at=timezone.now())
+                except DatabaseError:
+                    logger.warning(
+                        "Не удалось обновить сигнал задачи %s", self.job_id
+                    )
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def retry_delay(attempts):
+    return settings.JOB_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+
+
+def run_job(job):
+    heartbeat = Heartbeat(job.pk, job.worker)
+    heartbeat.start()
+    try:
+        registered = TASKS.get(job.name)
+        if registered is None:
+            raise LookupError(f"Неизвестная задача: {job.name}")
+        registered.func(job, **job.payload)
+    except Exception:
+        logger.exception("Задача %s #%s завершилась ошибкой", job.name, job.pk)
+        fields = {"error": traceback.format_exc(), "worker": ""}
+        if job.attempts < job.max_attempts:
+            fields.update(
+                state=Job.QUEUED,
+                run_at=timezone.now()
+                + timedelta(seconds=retry_delay(job.attempts)),
+            )
+        else:
+            fields.update(state=Job.FAILED, finished_at=timezone.now())
+    else:
+        fields = {
+            "state": Job.SUCCEEDED,
+            "error": "",
+            "finished_at": timezone.now(),
+        }
+    finally:
+        heartbeat.stop()
+
+    # A job taken for stale may already be running on another worker.
+    updated = Job.objects.filter(
+        pk=job.pk, state=Job.RUNNING, worker=job.worker
+    ).update(**fields)
+    if not updated:
+        logger.warning(
+            "Задача %s #%s уже возвращена в очередь, результат отброшен",
+            job.name, job.pk,
+        )
+        return None
+    return fields["state"]
+
+
+def requeue_stale_jobs():
+    stale = Job.objects.filter(
+        state=Job.RUNNING,
+        heartbeat_at__lt=timezone.now()
+        - timedelta(seconds=settings.JOB_STALE_TIMEOUT),
+    )
+    error = "Воркер перестал отвечать"
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        state=Job.FAILED, error=error, finished_at=timezone.now()
+    )
+    requeued = stale.update(state=Job.QUEUED, error=error, worker="")
+    return requeued + failed
+
+
+def prune_jobs(retention_days=None):
+    retention_days = retention_days or settings.JOB_RETENTION_DAYS
+    deleted, _ = Job.objects.filter(
+        state__in=(Job.SUCCEEDED, Job.FAILED),
+        finished_at__lt=timezone.now() - timedelta(days=retention_days),
+    ).delete()
+    return deleted
+
+
+def work(interval=None, once=False, stopped=None):
+    interval = interval or settings.JOB_POLL_INTERVAL
+    stopped = stopped or threading.Event()
+    worker = worker_name()
+    processed = 0
+    maintained_at = None
+
+    while not stopped.is_set():
+        try:
+            # Busy workers never go idle, so recovery runs on a timer.
+            now = time.monotonic()
+            if maintained_at is None or (
+                now - maintained_at >= settings.JOB_MAINTENANCE_INTERVAL
+            ):
+                requeue_stale_jobs()
+                prune_jobs()
+                maintained_at = now
+            job = claim(worker)
+            if job is not None:
+                run_job(job)
+                processed += 1
+                continue
+            if once:
+                break
+        except DatabaseError:
+            logger.exception("Ошибка базы данных в воркере %s", worker)
+            connections.close_all()
+        stopped.wait(interval)
+
+    return processed
+
+
+def run_workers(processes, interval=None):
+    stopped = threading.Event()
+
+    def worker_main():
+        worker_stopped = threading.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: worker_stopped.set())
+        work(interval, stopped=worker_stopped)
+
+    def start():
+        # Children must not share the parent's database sockets.
+        connections.close_all()
+        process = context.Process(target=worker_main, daemon=False)
+        process.start()
+        return process
+
+    context = multiprocessing.get_context("fork")
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stopped.set())
+
+    pool = [start() for _ in range(processes)]
+    while not stopped.wait(1):
+        for index, process in enumerate(pool):
+            if not process.is_alive():
+                logger.warning(
+                    "Воркер %s завершился с кодом %s, перезапуск",
+                    process.pid, process.exitcode,
+                )
+                pool[index] = start()
+
+    for process in pool:
+        process.terminate()
+    for process in pool:
+        process.join()
@@ -0,0 +1,28 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.stats import aggregate_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает дневную статистику авторов и рецептов, начиная "
+        "с последнего посчитанного дня"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Дата в формате ГГГГ-ММ-ДД")
+
+    def handle(self, *args, since, **options):
+        try:
+            since = date.fromisoformat(since) if since else None
+        except ValueError as e:
+            raise CommandError(e)
+
+        started = time.monotonic()
+        days = aggregate_stats(since)
+        self.stdout.write(
+            f"Пересчитано дней: {days} за {time.monotonic() - started:.2f} с"
+        )
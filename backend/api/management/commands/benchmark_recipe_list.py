@@ -0,0 +1,129 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeTag,
+    Tag,
+    User,
+)
+from api.serializers import RecipeListSerializer, RecipeSerializer
+
+INGREDIENTS_PER_RECIPE = 8
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает сериализацию списка рецептов через RecipeSerializer "
+        "и RecipeListSerializer в пересчёте на 1000 рецептов"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipes", type=int, default=1000)
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument(
+            "--user", help="Имя пользователя, от лица которого идёт запрос"
+        )
+
+    def seed(self, count):
+        author, _ = User.objects.get_or_create(
+            username="benchmark-author",
+            defaults={"email": "benchmark@example.com"},
+        )
+        ingredients = [
+            Ingredient.objects.get_or_create(
+                name=f"benchmark {index}", measurement_unit="г"
+            )[0]
+            for index in range(INGREDIENTS_PER_RECIPE * 2)
+        ]
+        tag, _ = Tag.objects.get_or_create(
+            slug="benchmark", defaults={"name": "benchmark"}
+        )
+        for index in range(count):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=f"Рецепт {index}",
+                text="Описание",
+                cooking_time=index % 90 + 1,
+                image=f"recipes/images/{index}.png",
+            )
+            offset = index % INGREDIENTS_PER_RECIPE
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(recipe=recipe, ingredient=ingredient,
+                                 amount=index % 500 + 1)
+                for ingredient in ingredients[
+                    offset:offset + INGREDIENTS_PER_RECIPE
+                ]
+            )
+            RecipeTag.objects.create(recipe=recipe, tag=tag)
+
+    def measure(self, serialize, runs):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        timings = []
+        for _ in range(runs):
+            queries.clear()
+            with connection.execute_wrapper(count):
+                started = time.perf_counter()
+                serialize()
+                timings.append(time.perf_counter() - started)
+        return statistics.median(timings), len(queries)
+
+    def handle(self, *args, recipes, runs, user, **options):
+        request = Request(APIRequestFactory().get(
+            "/api/recipes/", HTTP_HOST="localhost"
+        ))
+        request.user = (
+            User.objects.get(username=user) if user else AnonymousUser()
+        )
+        context = {"request": request}
+
+        with transaction.atomic():
+            missing = recipes - Recipe.objects.count()
+            if missing > 0:
+                self.stdout.write(
+                    f"Создаётся {missing} временных рецептов..."
+                )
+                self.seed(missing)
+
+            queryset = Recipe.objects.order_by("-pub_date")[:recipes]
+            results = {
+                "RecipeSerializer": self.measure(
+                    lambda: RecipeSerializer(
+                        queryset.all(), many=True, context=context
+                    ).data,
+                    runs,
+                ),
+                "RecipeListSerializer": self.measure(
+                    lambda: RecipeListSerializer(
+                        queryset.values(
+                            *RecipeListSerializer.get_values_fields()
+                        ),
+                        context=context,
+                    ).data,
+                    runs,
+                ),
+            }
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{recipes} рецептов, {runs} запусков, медиана:"
+        )
+        for name, (seconds, queries) in results.items():
+            per_thousand = seconds * 1000 * 1000 / recipes
+            self.stdout.write(
+                f"  {name:<22}{per_thousand:8.1f} мс на 1000 рецептов, "
+                f"{queries} запросов"
+            )
@@ -0,0 +1,75 @@
+import json
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+PROBE = """
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+started = time.monotonic()
+from foodgram.wsgi import application
+loaded = time.monotonic()
+warm = sys.argv[1] == "warm"
+if warm:
+    from api.warmup import warm_up
+    warm_up()
+warmed = time.monotonic()
+environ = {"PATH_INFO": sys.argv[2], "HTTP_HOST": "localhost"}
+setup_testing_defaults(environ)
+b"".join(application(environ, lambda status, headers: None))
+finished = time.monotonic()
+print(json.dumps({
+    "import": loaded - started,
+    "warm_up": warmed - loaded,
+    "first_request": finished - warmed,
+}))
+"""
+
+TOP_IMPORTS = 10
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет время импорта приложения, прогрева и первого запроса "
+        "в новых процессах"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--path", default="/api/recipes/")
+
+    def probe(self, mode, path):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE, mode, path],
+            capture_output=True, check=True, text=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def top_imports(self):
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c",
+             "import foodgram.wsgi"],
+            capture_output=True, check=True, text=True,
+        ).stderr
+        packages = Counter()
+        for line in stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[1].strip().isdigit():
+                own_time = int(parts[0].rsplit(":", 1)[1])
+                packages[parts[2].strip().split(".")[0]] += own_time
+        return packages.most_common(TOP_IMPORTS)
+
+    def handle(self, *args, runs, path, **options):
+        for mode in ("cold", "warm"):
+            results = [self.probe(mode, path) for _ in range(runs)]
+            self.stdout.write(f"{mode} ({runs} запусков, медиана):")
+            for metric in results[0]:
+                median = statistics.median(row[metric] for row in results)
+                self.stdout.write(f"  {metric:<14}{median * 1000:8.1f} мс")
+
+        self.stdout.write("Время импорта по пакетам:")
+        for name, microseconds in self.top_imports():
+            self.stdout.write(f"  {name:<24}{microseconds / 1000:8.1f} мс")
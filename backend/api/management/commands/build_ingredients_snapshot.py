@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.catalog import build_catalog_snapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    help = "Собирает сжатый снимок каталога ингредиентов"
+
+    def handle(self, *args, **options):
+        version = build_catalog_snapshot()
+        self.stdout.write(f"{snapshot_path()} ({version})")
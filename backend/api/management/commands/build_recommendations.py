@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.recommendations import rebuild_similarities
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает похожие рецепты по совместному добавлению "
+        "в избранное и корзину и по общим ингредиентам"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int)
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Перестроить таблицу целиком, а не только изменившиеся",
+        )
+
+    def handle(self, *args, top_k, full, **options):
+        started = time.monotonic()
+        changed = rebuild_similarities(top_k=top_k, full=full)
+        self.stdout.write(
+            f"Обновлено рецептов: {changed} "
+            f"за {time.monotonic() - started:.2f} с"
+        )
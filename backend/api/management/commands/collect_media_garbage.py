@@ -0,0 +1,38 @@
+import time
+from itertools import chain
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from api.export import expired_exports
+from api.storage import export_storage, orphaned_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет загруженные файлы, на которые не ссылается ни одна запись, "
+        "и устаревшие выгрузки данных"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать файлы, которые будут удалены",
+        )
+
+    def handle(self, *args, dry_run, **options):
+        removed = 0
+        for storage, name in chain(
+            ((default_storage, name) for name in orphaned_files()),
+            ((export_storage, name) for name in expired_exports(time.time())),
+        ):
+            if dry_run:
+                self.stdout.write(name)
+            else:
+                storage.delete(name)
+            removed += 1
+
+        self.stdout.write(
+            f"{'Найдено' if dry_run else 'Удалено'} файлов: {removed}"
+        )
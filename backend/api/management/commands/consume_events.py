@@ -0,0 +1,63 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.events import DEFAULT_CONSUMER, consume, prune_events
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Доставляет события из журнала зарегистрированным обработчикам "
+        "пачками, запоминая позицию после каждой пачки"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--consumer", default=DEFAULT_CONSUMER)
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.OUTBOX_POLL_INTERVAL,
+            help="Пауза в секундах, когда новых событий нет",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Обработать накопившиеся события и выйти",
+        )
+
+    def handle(self, *args, consumer, batch_size, interval, once,
+               **options):
+        total = 0
+        failures = 0
+        try:
+            while True:
+                try:
+                    processed = consume(consumer, batch_size)
+                except Exception as e:
+                    logger.exception("Ошибка обработки событий %s", consumer)
+                    if once:
+                        raise CommandError(e)
+                    # The batch was rolled back and is delivered again.
+                    failures += 1
+                    time.sleep(min(
+                        interval * 2 ** failures,
+                        settings.OUTBOX_MAX_RETRY_DELAY,
+                    ))
+                    continue
+                failures = 0
+                total += processed
+                if processed:
+                    continue
+                if once:
+                    break
+                prune_events()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(f"Обработано событий: {total}")
@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.jobs import TASKS, enqueue
+
+
+class Command(BaseCommand):
+    help = "Ставит фоновую задачу в очередь"
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", help=f"Одна из: {', '.join(TASKS)}")
+        parser.add_argument(
+            "--payload",
+            default="{}",
+            help='Параметры задачи в JSON, например {"full": true}',
+        )
+        parser.add_argument(
+            "--delay",
+            type=int,
+            default=0,
+            help="Запустить не раньше чем через столько секунд",
+        )
+
+    def handle(self, *args, name, payload, delay, **options):
+        try:
+            payload = json.loads(payload)
+        except ValueError as e:
+            raise CommandError(f"Некорректный JSON: {e}")
+        if not isinstance(payload, dict):
+            raise CommandError("Параметры должны быть JSON-объектом")
+
+        try:
+            job = enqueue(name, delay=delay, **payload)
+        except LookupError as e:
+            raise CommandError(e)
+
+        self.stdout.write(f"Задача #{job.pk} поставлена в очередь")
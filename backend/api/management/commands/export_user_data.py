@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from api.export import export_filename, stream_export
+from api.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает данные пользователя в zip-архив: строки в NDJSON "
+        "и исходные изображения"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("user", help="id, username или email")
+        parser.add_argument("--output")
+
+    def handle(self, *args, user, output, **options):
+        lookup = Q(username=user) | Q(email=user)
+        if user.isdigit():
+            lookup |= Q(pk=int(user))
+        instance = User.objects.filter(lookup).first()
+        if instance is None:
+            raise CommandError(f"Пользователь {user} не найден")
+
+        output = output or export_filename(instance)
+        size = 0
+        with open(output, "wb") as archive:
+            for chunk in stream_export(instance):
+                archive.write(chunk)
+                size += len(chunk)
+
+        self.stdout.write(f"{output}: {size} байт")
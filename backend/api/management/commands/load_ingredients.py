@@ -1,16 +1,12 @@
 import json
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.catalog import schedule_catalog_refresh
 from api.models import Ingredient
 
 
 class Command(BaseCommand):
     def handle(self, *args, **options):
-        try:
-            Ingredient.objects.all().delete()
-        except Exception as e:
-            print(e)
-            return
-
         file_path = 'ingredients.json'
         try:
             file = open(file_path, 'r', encoding='utf-8')
@@ -29,9 +25,13 @@ class Command(BaseCommand):
             )
 
         try:
-            Ingredient.objects.bulk_create(
-                new_ingredients,
-                ignore_conflicts=True
-            )
+            with transaction.atomic():
+                Ingredient.objects.all().delete()
+                Ingredient.objects.bulk_create(
+                    new_ingredients,
+                    ignore_conflicts=True
+                )
+                schedule_catalog_refresh()
         except Exception as e:
             print(e)
+            return
@@ -0,0 +1,60 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import Ingredient, IngredientNutrition
+from api.nutrition import recompute_recipe_nutrition
+
+NUTRITION_FIELDS = ("kcal", "protein", "fat", "carbohydrates", "price")
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает пищевую ценность и цены ингредиентов из JSON "
+        "и пересчитывает итоги всех рецептов"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+
+    def handle(self, *args, path, **options):
+        try:
+            with open(path, encoding="utf-8") as file:
+                rows = json.load(file)
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        ingredients = {
+            (name, unit): pk for pk, name, unit in
+            Ingredient.objects.values_list("id", "name", "measurement_unit")
+        }
+
+        nutrition = []
+        missing = 0
+        for row in rows:
+            ingredient_id = ingredients.get(
+                (row.get("name"), row.get("measurement_unit"))
+            )
+            if ingredient_id is None:
+                missing += 1
+                continue
+            nutrition.append(IngredientNutrition(
+                ingredient_id=ingredient_id,
+                **{field: row.get(field) for field in NUTRITION_FIELDS},
+            ))
+
+        started = time.monotonic()
+        with transaction.atomic():
+            IngredientNutrition.objects.all().delete()
+            IngredientNutrition.objects.bulk_create(
+                nutrition, batch_size=1_000
+            )
+            recipes = recompute_recipe_nutrition()
+
+        self.stdout.write(
+            f"Загружено: {len(nutrition)}, не найдено: {missing}, "
+            f"пересчитано рецептов: {recipes} "
+            f"за {time.monotonic() - started:.2f} с"
+        )
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.jobs import run_workers, work
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет фоновые задачи из очереди в нескольких процессах, "
+        "повторяя упавшие задачи с нарастающей паузой"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=settings.JOB_WORKER_PROCESSES,
+            help="Количество процессов-воркеров",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.JOB_POLL_INTERVAL,
+            help="Пауза в секундах, когда задач нет",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить готовые задачи в текущем процессе и выйти",
+        )
+
+    def handle(self, *args, processes, interval, once, **options):
+        if processes < 1:
+            raise CommandError("--processes должен быть не меньше 1")
+
+        if once:
+            processed = work(interval, once=True)
+            self.stdout.write(f"Выполнено задач: {processed}")
+            return
+
+        self.stdout.write(f"Запущено воркеров: {processes}")
+        run_workers(processes, interval)
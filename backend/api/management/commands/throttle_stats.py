@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.throttling import rejection_counts
+
+
+class Command(BaseCommand):
+    help = "Показывает, сколько запросов отклонено ограничителями частоты"
+
+    def handle(self, *args, **options):
+        for scope, count in rejection_counts().items():
+            self.stdout.write(f"{scope:<24}{count:>8}")
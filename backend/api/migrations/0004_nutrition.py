@@ -0,0 +1,47 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:18
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_recipe_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeNutrition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kcal', models.DecimalField(decimal_places=2, max_digits=14, null=True, verbose_name='Калории')),
+                ('protein', models.DecimalField(decimal_places=2, max_digits=14, null=True, verbose_name='Белки')),
+                ('fat', models.DecimalField(decimal_places=2, max_digits=14, null=True, verbose_name='Жиры')),
+                ('carbohydrates', models.DecimalField(decimal_places=2, max_digits=14, null=True, verbose_name='Углеводы')),
+                ('cost', models.DecimalField(decimal_places=2, max_digits=14, null=True, verbose_name='Стоимость')),
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='nutrition', to='api.recipe', verbose_name='Рецепт')),
+            ],
+            options={
+                'verbose_name': 'Пищевая ценность рецепта',
+                'verbose_name_plural': 'Пищевая ценность рецептов',
+            },
+        ),
+        migrations.CreateModel(
+            name='IngredientNutrition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kcal', models.DecimalField(decimal_places=4, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Калории на ед. измерения')),
+                ('protein', models.DecimalField(decimal_places=4, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Белки на ед. измерения')),
+                ('fat', models.DecimalField(decimal_places=4, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Жиры на ед. измерения')),
+                ('carbohydrates', models.DecimalField(decimal_places=4, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Углеводы на ед. измерения')),
+                ('price', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Цена за ед. измерения')),
+                ('ingredient', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='nutrition', to='api.ingredient', verbose_name='Ингредиент')),
+            ],
+            options={
+                'verbose_name': 'Пищевая ценность ингредиента',
+                'verbose_name_plural': 'Пищевая ценность ингредиентов',
+            },
+        ),
+    ]
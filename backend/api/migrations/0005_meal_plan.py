@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:20
+
+from decimal import Decimal
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_nutrition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MealPlanEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('servings', models.DecimalField(decimal_places=2, default=1, max_digits=6, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))], verbose_name='Порции')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meal_plan_entries', to='api.recipe', verbose_name='Рецепт')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meal_plan', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Запись плана питания',
+                'verbose_name_plural': 'План питания',
+                'ordering': ['date', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='mealplanentry',
+            index=models.Index(fields=['user', 'date'], name='meal_plan_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_recipe_similarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(max_length=64, unique=True, verbose_name='Обработчик')),
+                ('position', models.BigIntegerField(default=0, verbose_name='Последнее событие')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Позиция обработчика',
+                'verbose_name_plural': 'Позиции обработчиков',
+            },
+        ),
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('favorite_added', 'Добавлен в избранное'), ('favorite_removed', 'Удален из избранного'), ('shopping_cart_added', 'Добавлен в корзину'), ('shopping_cart_removed', 'Удален из корзины'), ('subscribed', 'Подписка'), ('unsubscribed', 'Отписка')], max_length=32, verbose_name='Тип события')),
+                ('user_id', models.BigIntegerField(verbose_name='Пользователь')),
+                ('object_id', models.BigIntegerField(verbose_name='Объект')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Данные')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Создано')),
+            ],
+            options={
+                'verbose_name': 'Событие',
+                'verbose_name_plural': 'Журнал событий',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
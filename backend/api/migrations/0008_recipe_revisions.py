@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер')),
+                ('is_snapshot', models.BooleanField(default=False, verbose_name='Полная копия')),
+                ('data', models.BinaryField(verbose_name='Данные')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='api.recipe', verbose_name='Рецепт')),
+            ],
+            options={
+                'verbose_name': 'Версия рецепта',
+                'verbose_name_plural': 'Версии рецептов',
+                'ordering': ['recipe', '-number'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reciperevision',
+            constraint=models.UniqueConstraint(fields=('recipe', 'number'), name='unique_recipe_revision'),
+        ),
+    ]
@@ -0,0 +1,124 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_recipe_revisions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='follow',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата подписки'),
+        ),
+        # The M2M tables already exist: adopt them as explicit through
+        # models without touching the database, then add the timestamp.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Favorite',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='favorites', to='api.recipe', verbose_name='Рецепт')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='favorites', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                    ],
+                    options={
+                        'verbose_name': 'Избранное',
+                        'verbose_name_plural': 'Избранное',
+                        'db_table': 'api_recipe_favorited_by',
+                        'unique_together': {('recipe', 'user')},
+                    },
+                ),
+                migrations.CreateModel(
+                    name='ShoppingCartItem',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_cart_items', to='api.recipe', verbose_name='Рецепт')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_cart_items', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                    ],
+                    options={
+                        'verbose_name': 'Рецепт в списке покупок',
+                        'verbose_name_plural': 'Списки покупок',
+                        'db_table': 'api_recipe_in_shopping_cart_for_users',
+                        'unique_together': {('recipe', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='recipe',
+                    name='favorited_by',
+                    field=models.ManyToManyField(blank=True, related_name='favorite_recipes', through='api.Favorite', to=settings.AUTH_USER_MODEL, verbose_name='В избранном у'),
+                ),
+                migrations.AlterField(
+                    model_name='recipe',
+                    name='in_shopping_cart_for_users',
+                    field=models.ManyToManyField(blank=True, related_name='shopping_cart_recipes', through='api.ShoppingCartItem', to=settings.AUTH_USER_MODEL, verbose_name='В списке покупок у'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=django.utils.timezone.now, verbose_name='Добавлено'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='shoppingcartitem',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=django.utils.timezone.now, verbose_name='Добавлено'),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='RecipeDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('favorites', models.PositiveIntegerField(default=0, verbose_name='Добавлений в избранное')),
+                ('shopping_carts', models.PositiveIntegerField(default=0, verbose_name='Добавлений в корзину')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='api.recipe', verbose_name='Рецепт')),
+            ],
+            options={
+                'verbose_name': 'Статистика рецепта за день',
+                'verbose_name_plural': 'Статистика рецептов по дням',
+                'ordering': ['recipe', 'date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AuthorDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('followers', models.PositiveIntegerField(default=0, verbose_name='Новых подписчиков')),
+                ('favorites', models.PositiveIntegerField(default=0, verbose_name='Добавлений в избранное')),
+                ('shopping_carts', models.PositiveIntegerField(default=0, verbose_name='Добавлений в корзину')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора за день',
+                'verbose_name_plural': 'Статистика авторов по дням',
+                'ordering': ['author', 'date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recipedailystats',
+            index=models.Index(fields=['date'], name='recipe_daily_stats_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipedailystats',
+            constraint=models.UniqueConstraint(fields=('recipe', 'date'), name='unique_recipe_daily_stats'),
+        ),
+        migrations.AddIndex(
+            model_name='authordailystats',
+            index=models.Index(fields=['date'], name='author_daily_stats_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='authordailystats',
+            constraint=models.UniqueConstraint(fields=('author', 'date'), name='unique_author_daily_stats'),
+        ),
+    ]
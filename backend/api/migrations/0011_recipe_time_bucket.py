@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+COOKING_TIME_BUCKETS = (
+    ("quick", 15),
+    ("medium", 30),
+    ("long", 60),
+    ("very_long", 32000),
+)
+
+
+def fill_time_buckets(apps, schema_editor):
+    Recipe = apps.get_model("api", "Recipe")
+    lower = 0
+    for name, limit in COOKING_TIME_BUCKETS:
+        Recipe.objects.filter(
+            cooking_time__gt=lower, cooking_time__lte=limit
+        ).update(time_bucket=name)
+        lower = limit
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='time_bucket',
+            field=models.CharField(choices=[('quick', 'quick'), ('medium', 'medium'), ('long', 'long'), ('very_long', 'very_long')], default='very_long', editable=False, max_length=16, verbose_name='Время приготовления'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_time_buckets, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['cooking_time', '-pub_date'], name='recipe_cooking_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['time_bucket', '-pub_date'], name='recipe_time_bucket_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataExport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archive', models.CharField(blank=True, max_length=255, verbose_name='Архив')),
+                ('requested_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Запрошена')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Готова')),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.job', verbose_name='Задача')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='data_export', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Выгрузка данных',
+                'verbose_name_plural': 'Выгрузки данных',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_data_export'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxcheckpoint',
+            name='gaps',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Пропущенные события'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .relations import RELATION_LOADERS, get_version
+
+
+class ConditionalGetMixin:
+    def get_list_validators(self, request):
+        return None, None
+
+    def get_detail_validators(self, request):
+        return None, None
+
+    def get_user_etag_part(self, request):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return "anon"
+
+        versions = "-".join(
+            str(get_version(kind, user.id)) for kind in RELATION_LOADERS
+        )
+        return f"{user.id}-{versions}"
+
+    def _conditional(self, request, validators, handler, *args, **kwargs):
+        # Versions kept in a per-process cache would miss changes made
+        # through other workers and answer 304 with stale data.
+        if not settings.SHARED_CACHE:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = validators()
+
+        if etag is None and last_modified is None:
+            return handler(request, *args, **kwargs)
+
+        if etag is not None:
+            etag = quote_etag(etag)
+        if isinstance(last_modified, datetime):
+            last_modified = int(last_modified.timestamp())
+        elif last_modified is not None:
+            last_modified = int(last_modified)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            if etag is not None:
+                response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+            patch_vary_headers(response, ("Authorization",))
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(
+            request, lambda: self.get_list_validators(request),
+            self.get_list_response, *args, **kwargs
+        )
+
+    def get_list_response(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(
+            request, lambda: self.get_detail_validators(request),
+            super().retrieve, *args, **kwargs
+        )
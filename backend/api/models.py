@@ -1,7 +1,10 @@
+from decimal import Decimal
+
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.utils import timezone
 
 MAX_EMAIL_LENGTH = 254
 MAX_USER_FIELD_LENGTH = 150
@@ -9,6 +12,34 @@ MAX_NAME_LENGTH = 128
 MAX_UNIT_LENGTH = 64
 MIN_INT_VALUE = 1
 MAX_INT_VALUE = 32_000
+NUTRITION_MAX_DIGITS = 12
+NUTRITION_DECIMAL_PLACES = 4
+TOTAL_MAX_DIGITS = 14
+TOTAL_DECIMAL_PLACES = 2
+SERVINGS_MAX_DIGITS = 6
+SERVINGS_DECIMAL_PLACES = 2
+MIN_SERVINGS = Decimal("0.01")
+MAX_TAG_LENGTH = 32
+MAX_EVENT_TYPE_LENGTH = 32
+MAX_CONSUMER_LENGTH = 64
+MAX_JOB_NAME_LENGTH = 64
+MAX_JOB_STATE_LENGTH = 16
+MAX_WORKER_LENGTH = 128
+MAX_ARCHIVE_NAME_LENGTH = 255
+COOKING_TIME_BUCKETS = (
+    ("quick", 15),
+    ("medium", 30),
+    ("long", 60),
+    ("very_long", MAX_INT_VALUE),
+)
+MAX_TIME_BUCKET_LENGTH = 16
+
+
+def get_time_bucket(cooking_time):
+    for name, limit in COOKING_TIME_BUCKETS:
+        if cooking_time <= limit:
+            return name
+    return COOKING_TIME_BUCKETS[-1][0]
 
 
 class User(AbstractUser):
@@ -78,6 +109,7 @@ class Follow(models.Model):
     created_at = models.DateTimeField(
         verbose_name="Дата подписки",
         auto_now_add=True,
+        db_index=True,
     )
 
     class Meta:
@@ -124,6 +156,27 @@ class Ingredient(models.Model):
         return f"{self.name}, {self.measurement_unit}"
 
 
+class Tag(models.Model):
+    name = models.CharField(
+        verbose_name="Название",
+        max_length=MAX_TAG_LENGTH,
+        unique=True,
+    )
+    slug = models.SlugField(
+        verbose_name="Слаг",
+        max_length=MAX_TAG_LENGTH,
+        unique=True,
+    )
+
+    class Meta:
+        verbose_name = "Тег"
+        verbose_name_plural = "Теги"
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -155,31 +208,160 @@ class Recipe(models.Model):
             MaxValueValidator(MAX_INT_VALUE),
         ],
     )
+    time_bucket = models.CharField(
+        verbose_name="Время приготовления",
+        max_length=MAX_TIME_BUCKET_LENGTH,
+        choices=[(name, name) for name, _ in COOKING_TIME_BUCKETS],
+        editable=False,
+    )
     pub_date = models.DateTimeField(
         verbose_name="Дата публикации",
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата изменения",
+        auto_now=True,
+        db_index=True,
+    )
     favorited_by = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
         related_name="favorite_recipes",
         verbose_name="В избранном у",
         blank=True,
+        through="Favorite",
     )
     in_shopping_cart_for_users = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
         related_name="shopping_cart_recipes",
         verbose_name="В списке покупок у",
         blank=True,
+        through="ShoppingCartItem",
+    )
+    tags = models.ManyToManyField(
+        Tag,
+        verbose_name="Теги",
+        related_name="recipes",
+        blank=True,
+        through="RecipeTag",
     )
 
     class Meta:
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
         ordering = ["-pub_date"]
+        indexes = [
+            models.Index(
+                fields=["cooking_time", "-pub_date"],
+                name="recipe_cooking_time_idx",
+            ),
+            models.Index(
+                fields=["time_bucket", "-pub_date"],
+                name="recipe_time_bucket_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.time_bucket = get_time_bucket(self.cooking_time)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "cooking_time" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "time_bucket"}
+        super().save(*args, **kwargs)
+
+
+class Favorite(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="favorites",
+        verbose_name="Рецепт",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="favorites",
+        verbose_name="Пользователь",
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Добавлено",
+        auto_now_add=True,
+        db_index=True,
+    )
+
+    class Meta:
+        db_table = "api_recipe_favorited_by"
+        verbose_name = "Избранное"
+        verbose_name_plural = "Избранное"
+        unique_together = [("recipe", "user")]
+
+    def __str__(self):
+        return f"{self.user} -> {self.recipe}"
+
+
+class ShoppingCartItem(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="shopping_cart_items",
+        verbose_name="Рецепт",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="shopping_cart_items",
+        verbose_name="Пользователь",
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Добавлено",
+        auto_now_add=True,
+        db_index=True,
+    )
+
+    class Meta:
+        db_table = "api_recipe_in_shopping_cart_for_users"
+        verbose_name = "Рецепт в списке покупок"
+        verbose_name_plural = "Списки покупок"
+        unique_together = [("recipe", "user")]
+
+    def __str__(self):
+        return f"{self.user} -> {self.recipe}"
+
+
+class RecipeTag(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="recipe_tags",
+        verbose_name="Рецепт",
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name="recipe_tags",
+        verbose_name="Тег",
+    )
+
+    class Meta:
+        verbose_name = "Тег рецепта"
+        verbose_name_plural = "Теги рецептов"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipe", "tag"],
+                name="unique_recipe_tag",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["tag", "recipe"],
+                name="recipe_tag_tag_recipe_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe}: {self.tag}"
+
 
 class RecipeIngredient(models.Model):
     recipe = models.ForeignKey(
@@ -215,3 +397,499 @@ class RecipeIngredient(models.Model):
 
     def __str__(self):
         return f"{self.amount} {self.ingredient} in {self.recipe}"
+
+
+class IngredientNutrition(models.Model):
+    ingredient = models.OneToOneField(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name="nutrition",
+        verbose_name="Ингредиент",
+    )
+    kcal = models.DecimalField(
+        verbose_name="Калории на ед. измерения",
+        max_digits=NUTRITION_MAX_DIGITS,
+        decimal_places=NUTRITION_DECIMAL_PLACES,
+        validators=[MinValueValidator(0)],
+    )
+    protein = models.DecimalField(
+        verbose_name="Белки на ед. измерения",
+        max_digits=NUTRITION_MAX_DIGITS,
+        decimal_places=NUTRITION_DECIMAL_PLACES,
+        validators=[MinValueValidator(0)],
+    )
+    fat = models.DecimalField(
+        verbose_name="Жиры на ед. измерения",
+        max_digits=NUTRITION_MAX_DIGITS,
+        decimal_places=NUTRITION_DECIMAL_PLACES,
+        validators=[MinValueValidator(0)],
+    )
+    carbohydrates = models.DecimalField(
+        verbose_name="Углеводы на ед. измерения",
+        max_digits=NUTRITION_MAX_DIGITS,
+        decimal_places=NUTRITION_DECIMAL_PLACES,
+        validators=[MinValueValidator(0)],
+    )
+    price = models.DecimalField(
+        verbose_name="Цена за ед. измерения",
+        max_digits=NUTRITION_MAX_DIGITS,
+        decimal_places=NUTRITION_DECIMAL_PLACES,
+        validators=[MinValueValidator(0)],
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = "Пищевая ценность ингредиента"
+        verbose_name_plural = "Пищевая ценность ингредиентов"
+
+    def __str__(self):
+        return f"{self.ingredient}: {self.kcal} ккал"
+
+
+class RecipeNutrition(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="nutrition",
+        verbose_name="Рецепт",
+    )
+    kcal = models.DecimalField(
+        verbose_name="Калории",
+        max_digits=TOTAL_MAX_DIGITS,
+        decimal_places=TOTAL_DECIMAL_PLACES,
+        null=True,
+    )
+    protein = models.DecimalField(
+        verbose_name="Белки",
+        max_digits=TOTAL_MAX_DIGITS,
+        decimal_places=TOTAL_DECIMAL_PLACES,
+        null=True,
+    )
+    fat = models.DecimalField(
+        verbose_name="Жиры",
+        max_digits=TOTAL_MAX_DIGITS,
+        decimal_places=TOTAL_DECIMAL_PLACES,
+        null=True,
+    )
+    carbohydrates = models.DecimalField(
+        verbose_name="Углеводы",
+        max_digits=TOTAL_MAX_DIGITS,
+        decimal_places=TOTAL_DECIMAL_PLACES,
+        null=True,
+    )
+    cost = models.DecimalField(
+        verbose_name="Стоимость",
+        max_digits=TOTAL_MAX_DIGITS,
+        decimal_places=TOTAL_DECIMAL_PLACES,
+        null=True,
+    )
+
+    class Meta:
+        verbose_name = "Пищевая ценность рецепта"
+        verbose_name_plural = "Пищевая ценность рецептов"
+
+    def __str__(self):
+        return f"{self.recipe}: {self.kcal} ккал"
+
+
+class MealPlanEntry(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="meal_plan",
+        verbose_name="Пользователь",
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="meal_plan_entries",
+        verbose_name="Рецепт",
+    )
+    date = models.DateField(
+        verbose_name="Дата",
+    )
+    servings = models.DecimalField(
+        verbose_name="Порции",
+        max_digits=SERVINGS_MAX_DIGITS,
+        decimal_places=SERVINGS_DECIMAL_PLACES,
+        default=1,
+        validators=[MinValueValidator(MIN_SERVINGS)],
+    )
+
+    class Meta:
+        verbose_name = "Запись плана питания"
+        verbose_name_plural = "План питания"
+        ordering = ["date", "id"]
+        indexes = [
+            models.Index(
+                fields=["user", "date"],
+                name="meal_plan_user_date_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user}: {self.recipe} ({self.date})"
+
+
+class RecipeSimilarity(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="similar_recipes",
+        verbose_name="Рецепт",
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="similar_to",
+        verbose_name="Похожий рецепт",
+    )
+    score = models.FloatField(
+        verbose_name="Сходство",
+    )
+
+    class Meta:
+        verbose_name = "Похожий рецепт"
+        verbose_name_plural = "Похожие рецепты"
+        ordering = ["-score"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipe", "similar"],
+                name="unique_recipe_similarity",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["recipe", "-score"],
+                name="recipe_similarity_score_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe} ~ {self.similar}: {self.score:.3f}"
+
+
+class OutboxEvent(models.Model):
+    FAVORITE_ADDED = "favorite_added"
+    FAVORITE_REMOVED = "favorite_removed"
+    SHOPPING_CART_ADDED = "shopping_cart_added"
+    SHOPPING_CART_REMOVED = "shopping_cart_removed"
+    SUBSCRIBED = "subscribed"
+    UNSUBSCRIBED = "unsubscribed"
+    EVENT_TYPES = [
+        (FAVORITE_ADDED, "Добавлен в избранное"),
+        (FAVORITE_REMOVED, "Удален из избранного"),
+        (SHOPPING_CART_ADDED, "Добавлен в корзину"),
+        (SHOPPING_CART_REMOVED, "Удален из корзины"),
+        (SUBSCRIBED, "Подписка"),
+        (UNSUBSCRIBED, "Отписка"),
+    ]
+
+    event_type = models.CharField(
+        verbose_name="Тип события",
+        max_length=MAX_EVENT_TYPE_LENGTH,
+        choices=EVENT_TYPES,
+    )
+    user_id = models.BigIntegerField(
+        verbose_name="Пользователь",
+    )
+    object_id = models.BigIntegerField(
+        verbose_name="Объект",
+    )
+    payload = models.JSONField(
+        verbose_name="Данные",
+        default=dict,
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Создано",
+        auto_now_add=True,
+        db_index=True,
+    )
+
+    class Meta:
+        verbose_name = "Событие"
+        verbose_name_plural = "Журнал событий"
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"{self.event_type}: {self.user_id} -> {self.object_id}"
+
+
+class OutboxCheckpoint(models.Model):
+    consumer = models.CharField(
+        verbose_name="Обработчик",
+        max_length=MAX_CONSUMER_LENGTH,
+        unique=True,
+    )
+    position = models.BigIntegerField(
+        verbose_name="Последнее событие",
+        default=0,
+    )
+    gaps = models.JSONField(
+        verbose_name="Пропущенные события",
+        default=dict,
+        blank=True,
+    )
+    updated_at = models.DateTimeField(
+        verbose_name="Обновлено",
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = "Позиция обработчика"
+        verbose_name_plural = "Позиции обработчиков"
+
+    def __str__(self):
+        return f"{self.consumer}: {self.position}"
+
+
+class RecipeRevision(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="revisions",
+        verbose_name="Рецепт",
+    )
+    number = models.PositiveIntegerField(
+        verbose_name="Номер",
+    )
+    is_snapshot = models.BooleanField(
+        verbose_name="Полная копия",
+        default=False,
+    )
+    data = models.BinaryField(
+        verbose_name="Данные",
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Создана",
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name = "Версия рецепта"
+        verbose_name_plural = "Версии рецептов"
+        ordering = ["recipe", "-number"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipe", "number"],
+                name="unique_recipe_revision",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe} #{self.number}"
+
+
+class RecipeDailyStats(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+        verbose_name="Рецепт",
+    )
+    date = models.DateField(
+        verbose_name="Дата",
+    )
+    favorites = models.PositiveIntegerField(
+        verbose_name="Добавлений в избранное",
+        default=0,
+    )
+    shopping_carts = models.PositiveIntegerField(
+        verbose_name="Добавлений в корзину",
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = "Статистика рецепта за день"
+        verbose_name_plural = "Статистика рецептов по дням"
+        ordering = ["recipe", "date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipe", "date"],
+                name="unique_recipe_daily_stats",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["date"],
+                name="recipe_daily_stats_date_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe}: {self.date}"
+
+
+class AuthorDailyStats(models.Model):
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+        verbose_name="Автор",
+    )
+    date = models.DateField(
+        verbose_name="Дата",
+    )
+    followers = models.PositiveIntegerField(
+        verbose_name="Новых подписчиков",
+        default=0,
+    )
+    favorites = models.PositiveIntegerField(
+        verbose_name="Добавлений в избранное",
+        default=0,
+    )
+    shopping_carts = models.PositiveIntegerField(
+        verbose_name="Добавлений в корзину",
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = "Статистика автора за день"
+        verbose_name_plural = "Статистика авторов по дням"
+        ordering = ["author", "date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["author", "date"],
+                name="unique_author_daily_stats",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["date"],
+                name="author_daily_stats_date_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.author}: {self.date}"
+
+
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATES = [
+        (QUEUED, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (SUCCEEDED, "Выполнена"),
+        (FAILED, "Ошибка"),
+    ]
+
+    name = models.CharField(
+        verbose_name="Задача",
+        max_length=MAX_JOB_NAME_LENGTH,
+    )
+    payload = models.JSONField(
+        verbose_name="Параметры",
+        default=dict,
+        blank=True,
+    )
+    state = models.CharField(
+        verbose_name="Состояние",
+        max_length=MAX_JOB_STATE_LENGTH,
+        choices=STATES,
+        default=QUEUED,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name="Попыток",
+        default=0,
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name="Максимум попыток",
+    )
+    progress = models.PositiveIntegerField(
+        verbose_name="Выполнено",
+        default=0,
+    )
+    total = models.PositiveIntegerField(
+        verbose_name="Всего",
+        null=True,
+        blank=True,
+    )
+    error = models.TextField(
+        verbose_name="Ошибка",
+        blank=True,
+    )
+    worker = models.CharField(
+        verbose_name="Воркер",
+        max_length=MAX_WORKER_LENGTH,
+        blank=True,
+    )
+    run_at = models.DateTimeField(
+        verbose_name="Запустить после",
+        default=timezone.now,
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Создана",
+        auto_now_add=True,
+    )
+    started_at = models.DateTimeField(
+        verbose_name="Запущена",
+        null=True,
+        blank=True,
+    )
+    finished_at = models.DateTimeField(
+        verbose_name="Завершена",
+        null=True,
+        blank=True,
+    )
+    heartbeat_at = models.DateTimeField(
+        verbose_name="Последний сигнал",
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ["-id"]
+        indexes = [
+            models.Index(
+                fields=["state", "run_at"],
+                name="job_state_run_at_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk}: {self.state}"
+
+
+class DataExport(models.Model):
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="data_export",
+        verbose_name="Пользователь",
+    )
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+        verbose_name="Задача",
+    )
+    archive = models.CharField(
+        verbose_name="Архив",
+        max_length=MAX_ARCHIVE_NAME_LENGTH,
+        blank=True,
+    )
+    requested_at = models.DateTimeField(
+        verbose_name="Запрошена",
+        default=timezone.now,
+    )
+    finished_at = models.DateTimeField(
+        verbose_name="Готова",
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = "Выгрузка данных"
+        verbose_name_plural = "Выгрузки данных"
+
+    def __str__(self):
+        return f"{self.user}: {self.archive or self.job}"
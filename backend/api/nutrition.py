@@ -0,0 +1,99 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum
+
+from .models import (
+    TOTAL_DECIMAL_PLACES,
+    TOTAL_MAX_DIGITS,
+    RecipeIngredient,
+    RecipeNutrition,
+)
+
+NUTRIENTS = {
+    "kcal": "kcal",
+    "protein": "protein",
+    "fat": "fat",
+    "carbohydrates": "carbohydrates",
+    "cost": "price",
+}
+
+TOTAL_QUANTUM = Decimal(1).scaleb(-TOTAL_DECIMAL_PLACES)
+
+
+def missing_key(total):
+    return f"{total}_missing"
+
+
+def total_expressions(amount=F("amount")):
+    expressions = {}
+    for total, field in NUTRIENTS.items():
+        expressions[total] = Sum(
+            amount * F(f"ingredient__nutrition__{field}"),
+            output_field=DecimalField(
+                max_digits=TOTAL_MAX_DIGITS + TOTAL_DECIMAL_PLACES,
+                decimal_places=TOTAL_DECIMAL_PLACES * 2,
+            ),
+        )
+        # SUM skips NULL, so count the ingredients without a value.
+        expressions[missing_key(total)] = Count(
+            "pk",
+            filter=Q(**{f"ingredient__nutrition__{field}__isnull": True}),
+        )
+    return expressions
+
+
+def quantize(value):
+    if value is None:
+        return None
+    return Decimal(value).quantize(TOTAL_QUANTUM, rounding=ROUND_HALF_UP)
+
+
+def complete_totals(row):
+    return {
+        total: None if row[missing_key(total)] else quantize(row[total])
+        for total in NUTRIENTS
+    }
+
+
+@transaction.atomic
+def recompute_recipe_nutrition(recipes=None):
+    items = RecipeIngredient.objects.all()
+    existing = RecipeNutrition.objects.all()
+
+    if recipes is not None:
+        items = items.filter(recipe__in=recipes)
+        existing = existing.filter(recipe__in=recipes)
+
+    rows = (
+        items.values("recipe_id")
+        .annotate(**total_expressions())
+        .order_by()
+    )
+
+    existing.delete()
+    return len(RecipeNutrition.objects.bulk_create(
+        (
+            RecipeNutrition(
+                recipe_id=row["recipe_id"],
+                **complete_totals(row),
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1_000,
+    ))
+
+
+def recompute_ingredient_recipes(ingredients):
+    return recompute_recipe_nutrition(
+        RecipeIngredient.objects.filter(
+            ingredient__in=ingredients
+        ).values("recipe_id")
+    )
+
+
+def cart_totals(user):
+    totals = RecipeIngredient.objects.filter(
+        recipe__in_shopping_cart_for_users=user
+    ).aggregate(**total_expressions())
+    return complete_totals(totals)
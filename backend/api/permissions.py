@@ -12,3 +12,9 @@ class DefaultPermission(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
         return obj.author == request.user
+
+
+class AuthorPermission(permissions.IsAuthenticated):
+
+    def has_object_permission(self, request, view, obj):
+        return obj.author == request.user
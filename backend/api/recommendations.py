@@ -0,0 +1,186 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import (
+    Favorite,
+    Recipe,
+    RecipeIngredient,
+    RecipeSimilarity,
+    ShoppingCartItem,
+)
+
+
+COOCCURRENCE_WEIGHT = 0.7
+MAX_BASKET_SIZE = 500
+MAX_INGREDIENT_SHARE = 0.05
+SCORE_PRECISION = 6
+CHUNK_SIZE = 10_000
+
+
+def load_baskets():
+    baskets = defaultdict(set)
+    for through in (Favorite, ShoppingCartItem):
+        rows = through.objects.values_list("user_id", "recipe_id")
+        for user_id, recipe_id in rows.iterator(chunk_size=CHUNK_SIZE):
+            baskets[user_id].add(recipe_id)
+    return baskets
+
+
+def cooccurrence_scores(baskets, max_basket_size=MAX_BASKET_SIZE):
+    pairs = defaultdict(Counter)
+    for items in baskets.values():
+        items = sorted(items)[-max_basket_size:]
+        for recipe_id in items:
+            pairs[recipe_id].update(items)
+
+    norms = {
+        recipe_id: 1 / math.sqrt(others.pop(recipe_id))
+        for recipe_id, others in pairs.items()
+    }
+    scores = {}
+    for recipe_id, others in pairs.items():
+        norm = norms[recipe_id]
+        scores[recipe_id] = {
+            other: together * norm * norms[other]
+            for other, together in others.items()
+        }
+    return scores
+
+
+def ingredient_scores(max_share=MAX_INGREDIENT_SHARE):
+    recipe_ingredients = defaultdict(set)
+    rows = RecipeIngredient.objects.values_list("recipe_id", "ingredient_id")
+    for recipe_id, ingredient_id in rows.iterator(chunk_size=CHUNK_SIZE):
+        recipe_ingredients[recipe_id].add(ingredient_id)
+
+    recipes_by_ingredient = defaultdict(list)
+    for recipe_id, ingredients in recipe_ingredients.items():
+        for ingredient_id in ingredients:
+            recipes_by_ingredient[ingredient_id].append(recipe_id)
+
+    max_recipes = max(2, int(len(recipe_ingredients) * max_share))
+    scores = {}
+    for recipe_id, ingredients in recipe_ingredients.items():
+        shared = Counter()
+        for ingredient_id in ingredients:
+            recipes = recipes_by_ingredient[ingredient_id]
+            if len(recipes) <= max_recipes:
+                shared.update(recipes)
+        shared.pop(recipe_id, None)
+
+        scores[recipe_id] = {
+            other: common / (
+                len(ingredients) + len(recipe_ingredients[other]) - common
+            )
+            for other, common in shared.items()
+        }
+    return scores
+
+
+def combine_scores(by_users, by_ingredients):
+    if not by_ingredients:
+        return {
+            other: COOCCURRENCE_WEIGHT * score
+            for other, score in by_users.items()
+        }
+    combined = {
+        other: (1 - COOCCURRENCE_WEIGHT) * score
+        for other, score in by_ingredients.items()
+    }
+    for other, score in by_users.items():
+        combined[other] = (
+            combined.get(other, 0) + COOCCURRENCE_WEIGHT * score
+        )
+    return combined
+
+
+def top_neighbors(top_k, cooccurrence, ingredients):
+    neighbors = {}
+    for recipe_id in cooccurrence.keys() | ingredients.keys():
+        combined = combine_scores(
+            cooccurrence.get(recipe_id, {}), ingredients.get(recipe_id, {})
+        )
+        neighbors[recipe_id] = [
+            (-other, round(score, SCORE_PRECISION))
+            for score, other in heapq.nlargest(
+                top_k,
+                ((score, -other) for other, score in combined.items()),
+            )
+        ]
+    return neighbors
+
+
+def stored_neighbors():
+    stored = defaultdict(list)
+    rows = RecipeSimilarity.objects.order_by(
+        "recipe_id", "-score", "similar_id"
+    ).values_list("recipe_id", "similar_id", "score")
+    for recipe_id, similar_id, score in rows.iterator(chunk_size=CHUNK_SIZE):
+        stored[recipe_id].append((similar_id, score))
+    return stored
+
+
+@transaction.atomic
+def rebuild_similarities(top_k=None, full=False):
+    top_k = top_k or settings.RECOMMENDATIONS_TOP_K
+    neighbors = top_neighbors(
+        top_k, cooccurrence_scores(load_baskets()), ingredient_scores()
+    )
+
+    if full:
+        RecipeSimilarity.objects.all().delete()
+        stored = {}
+    else:
+        stored = stored_neighbors()
+
+    changed = [
+        recipe_id for recipe_id in neighbors.keys() | stored.keys()
+        if neighbors.get(recipe_id, []) != stored.get(recipe_id, [])
+    ]
+    existing = set(Recipe.objects.values_list("id", flat=True))
+
+    RecipeSimilarity.objects.filter(recipe_id__in=changed).delete()
+    RecipeSimilarity.objects.bulk_create(
+        (
+            RecipeSimilarity(
+                recipe_id=recipe_id, similar_id=similar_id, score=score
+            )
+            for recipe_id in changed if recipe_id in existing
+            for similar_id, score in neighbors.get(recipe_id, [])
+            if similar_id in existing
+        ),
+        batch_size=1_000,
+    )
+    return len(changed)
+
+
+def similar_recipes(recipe_id, limit=None):
+    return Recipe.objects.filter(
+        similar_to__recipe_id=recipe_id
+    ).order_by("-similar_to__score")[:limit or settings.RECOMMENDATIONS_TOP_K]
+
+
+def recommended_recipes(user, limit=None):
+    seen = (
+        Favorite.objects.filter(user=user).values("recipe_id")
+        .union(
+            ShoppingCartItem.objects.filter(user=user)
+            .values("recipe_id")
+        )
+    )
+    ids = list(
+        RecipeSimilarity.objects.filter(recipe_id__in=seen)
+        .exclude(similar_id__in=seen)
+        .values("similar_id")
+        .annotate(total=Sum("score"))
+        .order_by("-total", "similar_id")
+        .values_list("similar_id", flat=True)
+        [:limit or settings.RECOMMENDATIONS_TOP_K]
+    )
+    recipes = Recipe.objects.in_bulk(ids)
+    return [recipes[pk] for pk in ids if pk in recipes]
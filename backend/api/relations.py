@@ -0,0 +1,98 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Favorite, Follow, ShoppingCartItem
+
+FAVORITES = "favorites"
+SHOPPING_CART = "shopping_cart"
+FOLLOWING = "following"
+
+RELATION_LOADERS = {
+    FAVORITES: lambda user_id: Favorite.objects.filter(
+        user_id=user_id
+    ).values_list("recipe_id", flat=True),
+    SHOPPING_CART: lambda user_id: ShoppingCartItem.objects.filter(
+        user_id=user_id
+    ).values_list("recipe_id", flat=True),
+    FOLLOWING: lambda user_id: Follow.objects.filter(
+        user_id=user_id
+    ).values_list("author_id", flat=True),
+}
+
+
+EMBEDDED_VERSION_KEY = "relations:embedded:version"
+
+
+def get_embedded_version():
+    return cache.get_or_set(EMBEDDED_VERSION_KEY, time.time, None)
+
+
+def bump_embedded_version():
+    if settings.SHARED_CACHE:
+        transaction.on_commit(
+            lambda: cache.set(EMBEDDED_VERSION_KEY, time.time(), None)
+        )
+
+
+def _version_key(kind, user_id):
+    return f"relations:{kind}:{user_id}:version"
+
+
+def _ids_key(kind, user_id, version):
+    return f"relations:{kind}:{user_id}:{version}"
+
+
+def _bump_versions(kind, user_ids):
+    for user_id in user_ids:
+        key = _version_key(kind, user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+
+
+def bump_version(kind, *user_ids):
+    if not settings.SHARED_CACHE or not user_ids:
+        return
+    # Bumping before commit would let a concurrent request cache the old
+    # ids under the new version.
+    transaction.on_commit(lambda: _bump_versions(kind, user_ids))
+
+
+def get_version(kind, user_id):
+    return cache.get_or_set(_version_key(kind, user_id), 1, None)
+
+
+def load_ids(kind, user_id):
+    if not settings.SHARED_CACHE:
+        return frozenset(RELATION_LOADERS[kind](user_id))
+
+    version = get_version(kind, user_id)
+    key = _ids_key(kind, user_id, version)
+    ids = cache.get(key)
+
+    if ids is None:
+        ids = frozenset(RELATION_LOADERS[kind](user_id))
+        cache.set(key, ids, settings.RELATIONS_CACHE_TIMEOUT)
+
+    return ids
+
+
+def get_relation_ids(request, kind):
+    if request is None:
+        return frozenset()
+
+    user = request.user
+    if not (user and user.is_authenticated):
+        return frozenset()
+
+    http_request = getattr(request, "_request", request)
+    relations = http_request.__dict__.setdefault("_user_relations", {})
+
+    if kind not in relations:
+        relations[kind] = load_ids(kind, user.id)
+
+    return relations[kind]
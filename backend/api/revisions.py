@@ -0,0 +1,206 @@
+import difflib
+import json
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Ingredient, Recipe, RecipeIngredient, RecipeRevision
+from .nutrition import recompute_recipe_nutrition
+
+SCALAR_FIELDS = ("name", "cooking_time")
+TEXT_FIELDS = ("text",)
+
+
+def lock_recipe(recipe):
+    # Revision numbers are read and incremented, so edits of one recipe
+    # take turns on its row and start from the committed state.
+    fields = (*SCALAR_FIELDS, *TEXT_FIELDS)
+    locked = Recipe.objects.select_for_update().only(*fields).get(
+        pk=recipe.pk
+    )
+    for field in fields:
+        setattr(recipe, field, getattr(locked, field))
+
+
+def recipe_state(recipe):
+    return {
+        "name": recipe.name,
+        "text": recipe.text,
+        "cooking_time": recipe.cooking_time,
+        "ingredients": {
+            str(ingredient_id): amount
+            for ingredient_id, amount in RecipeIngredient.objects.filter(
+                recipe=recipe
+            ).values_list("ingredient_id", "amount")
+        },
+    }
+
+
+def diff_text(old, new):
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(
+        None, old_lines, new_lines, autojunk=False
+    )
+    return [
+        [start, end, "".join(new_lines[new_start:new_end])]
+        for tag, start, end, new_start, new_end in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def patch_text(old, opcodes):
+    lines = old.splitlines(keepends=True)
+    for start, end, replacement in reversed(opcodes):
+        lines[start:end] = replacement.splitlines(keepends=True)
+    return "".join(lines)
+
+
+def make_diff(old, new):
+    diff = {
+        field: new[field] for field in SCALAR_FIELDS
+        if old[field] != new[field]
+    }
+    for field in TEXT_FIELDS:
+        if old[field] != new[field]:
+            diff[field] = diff_text(old[field], new[field])
+
+    changed = {
+        key: amount for key, amount in new["ingredients"].items()
+        if old["ingredients"].get(key) != amount
+    }
+    removed = sorted(old["ingredients"].keys() - new["ingredients"].keys())
+    if changed:
+        diff["ingredients"] = changed
+    if removed:
+        diff["removed"] = removed
+    return diff
+
+
+def apply_diff(state, diff):
+    state = {**state, "ingredients": dict(state["ingredients"])}
+    for field in SCALAR_FIELDS:
+        if field in diff:
+            state[field] = diff[field]
+    for field in TEXT_FIELDS:
+        if field in diff:
+            state[field] = patch_text(state[field], diff[field])
+
+    state["ingredients"].update(diff.get("ingredients", {}))
+    for key in diff.get("removed", ()):
+        state["ingredients"].pop(key, None)
+    return state
+
+
+def pack(payload):
+    return zlib.compress(
+        json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        .encode()
+    )
+
+
+def unpack(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def reconstruct(recipe_id, number):
+    revisions = list(
+        RecipeRevision.objects.filter(
+            recipe_id=recipe_id,
+            number__lte=number,
+            number__gte=RecipeRevision.objects.filter(
+                recipe_id=recipe_id, number__lte=number, is_snapshot=True
+            ).order_by("-number").values("number")[:1],
+        ).order_by("number").values_list("number", "data")
+    )
+    if not revisions or revisions[-1][0] != number:
+        return None
+
+    state = unpack(revisions[0][1])
+    for _, data in revisions[1:]:
+        state = apply_diff(state, unpack(data))
+    return state
+
+
+def describe_state(state):
+    ingredients = Ingredient.objects.in_bulk(
+        [int(key) for key in state["ingredients"]]
+    )
+    return {
+        "name": state["name"],
+        "text": state["text"],
+        "cooking_time": state["cooking_time"],
+        "ingredients": [
+            {
+                "id": int(key),
+                "name": ingredients[int(key)].name,
+                "measurement_unit": ingredients[int(key)].measurement_unit,
+                "amount": amount,
+            }
+            if int(key) in ingredients else {"id": int(key), "amount": amount}
+            for key, amount in state["ingredients"].items()
+        ],
+    }
+
+
+def _create_revision(recipe, number, previous, state):
+    is_snapshot = (
+        previous is None
+        or (number - 1) % settings.RECIPE_SNAPSHOT_INTERVAL == 0
+    )
+    return RecipeRevision.objects.create(
+        recipe=recipe,
+        number=number,
+        is_snapshot=is_snapshot,
+        data=pack(state if is_snapshot else make_diff(previous, state)),
+    )
+
+
+def record_revision(recipe, before=None):
+    last = recipe.revisions.order_by("-number").values_list(
+        "number", flat=True
+    ).first()
+    if last is None:
+        last = 0
+        if before is not None:
+            last = _create_revision(recipe, 1, None, before).number
+        previous = before
+    else:
+        previous = reconstruct(recipe.pk, last)
+
+    state = recipe_state(recipe)
+    if state == previous:
+        return None
+    return _create_revision(recipe, last + 1, previous, state)
+
+
+@transaction.atomic
+def restore_revision(recipe, number):
+    lock_recipe(recipe)
+    state = reconstruct(recipe.pk, number)
+    if state is None:
+        return None
+
+    before = recipe_state(recipe)
+    recipe.name = state["name"]
+    recipe.text = state["text"]
+    recipe.cooking_time = state["cooking_time"]
+    recipe.save()
+
+    existing = set(
+        Ingredient.objects.filter(
+            pk__in=[int(key) for key in state["ingredients"]]
+        ).values_list("pk", flat=True)
+    )
+    recipe.recipe_ingredients.all().delete()
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(
+            recipe=recipe, ingredient_id=int(key), amount=amount
+        )
+        for key, amount in state["ingredients"].items()
+        if int(key) in existing
+    )
+    recompute_recipe_nutrition([recipe.pk])
+    record_revision(recipe, before)
+    return recipe
@@ -1,13 +1,23 @@
+from operator import itemgetter
+
 from rest_framework import serializers
+from django.core.files.storage import default_storage
 from django.db import transaction
-from drf_extra_fields.fields import Base64ImageField
 from .models import (
     Ingredient,
+    MealPlanEntry,
     Recipe,
     RecipeIngredient,
+    RecipeNutrition,
+    RecipeRevision,
+    RecipeTag,
+    Tag,
     User,
     MIN_INT_VALUE,
     MAX_INT_VALUE,
+    MIN_SERVINGS,
+    SERVINGS_DECIMAL_PLACES,
+    SERVINGS_MAX_DIGITS,
 )
 from django.core.validators import (
     MinValueValidator, MaxValueValidator,
@@ -18,10 +28,25 @@ from django.contrib.auth.validators import (
 from rest_framework.validators import (
     UniqueValidator,
 )
+from .fields import BoundedBase64ImageField
+from .fieldsets import (
+    SparseFieldsetMixin,
+    collapses,
+    nested_fieldset,
+    selects,
+)
+from .nutrition import recompute_recipe_nutrition
+from .revisions import lock_recipe, record_revision, recipe_state
+from .relations import (
+    FAVORITES,
+    FOLLOWING,
+    SHOPPING_CART,
+    get_relation_ids,
+)
 
 
 class AvatarSerializer(serializers.ModelSerializer):
-    avatar = Base64ImageField(
+    avatar = BoundedBase64ImageField(
         required=True
     )
 
@@ -62,7 +87,9 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return user
 
 
-class RecipeIngredientReadSerializer(serializers.ModelSerializer):
+class RecipeIngredientReadSerializer(
+    SparseFieldsetMixin, serializers.ModelSerializer
+):
     id = serializers.ReadOnlyField(
         source="ingredient.id"
     )
@@ -84,7 +111,13 @@ class IngredientSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "measurement_unit")
 
 
-class UserSerializer(serializers.ModelSerializer):
+class TagSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ("id", "name", "slug")
+
+
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
     avatar = serializers.ImageField(
@@ -108,13 +141,8 @@ class UserSerializer(serializers.ModelSerializer):
     def get_is_subscribed(self, obj):
         request = self.context.get("request")
 
-        if not request:
-            return False
-
-        user = request.user
-
-        return (user and user.is_authenticated and isinstance(obj, User)
-                and user.follower.filter(author=obj).exists())
+        return (isinstance(obj, User)
+                and obj.id in get_relation_ids(request, FOLLOWING))
 
 
 class RecipeIngredientSerializer(serializers.Serializer):
@@ -127,9 +155,13 @@ class RecipeIngredientSerializer(serializers.Serializer):
     )
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    collapsed_fields = {
+        "author": lambda: serializers.PrimaryKeyRelatedField(read_only=True),
+    }
+
     author = UserSerializer(read_only=True)
-    image = Base64ImageField(required=True)
+    image = BoundedBase64ImageField(required=True)
     is_favorited = serializers.SerializerMethodField(read_only=True)
     is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
 
@@ -151,6 +183,13 @@ class RecipeSerializer(serializers.ModelSerializer):
         write_only=True,
         source="ingredients_for_processing"
     )
+    tags = serializers.PrimaryKeyRelatedField(
+        queryset=Tag.objects.all(),
+        many=True,
+        required=False,
+        write_only=True,
+        source="tags_for_processing",
+    )
 
     class Meta:
         model = Recipe
@@ -164,6 +203,7 @@ class RecipeSerializer(serializers.ModelSerializer):
             "is_favorited",
             "is_in_shopping_cart",
             "text",
+            "tags",
         )
 
     def to_representation(self, instance):
@@ -171,10 +211,31 @@ class RecipeSerializer(serializers.ModelSerializer):
 
         representation.pop("ingredients_for_processing", None)
 
+        fieldset = self.get_fieldset()
+        if collapses(fieldset, "tags"):
+            representation["tags"] = [tag.id for tag in instance.tags.all()]
+        elif selects(fieldset, "tags"):
+            representation["tags"] = TagSerializer(
+                instance.tags.all(),
+                many=True,
+                fieldset=nested_fieldset(fieldset, "tags"),
+            ).data
+
+        if not selects(fieldset, "ingredients"):
+            return representation
+
+        if collapses(fieldset, "ingredients"):
+            representation["ingredients"] = [
+                item.ingredient_id
+                for item in instance.recipe_ingredients.all()
+            ]
+            return representation
+
         representation["ingredients"] = RecipeIngredientReadSerializer(
             instance.recipe_ingredients.all(),
             many=True,
             context=self.context,
+            fieldset=nested_fieldset(fieldset, "ingredients"),
         ).data
 
         return representation
@@ -206,21 +267,23 @@ class RecipeSerializer(serializers.ModelSerializer):
                 {"ingredients": "Ингредиенты должны быть уникальными"}
             )
 
+        tags = data.get("tags_for_processing", [])
+        if len(tags) != len(set(tags)):
+            raise serializers.ValidationError(
+                {"tags": "Теги должны быть уникальными"}
+            )
+
         return data
 
     def get_is_in_shopping_cart(self, obj):
-        user = self.context["request"].user
-
-        if user and user.is_authenticated:
-            return obj.in_shopping_cart_for_users.filter(id=user.id).exists()
-        return False
+        return obj.id in get_relation_ids(
+            self.context.get("request"), SHOPPING_CART
+        )
 
     def get_is_favorited(self, obj):
-        user = self.context["request"].user
-
-        if user and user.is_authenticated:
-            return obj.favorited_by.filter(id=user.id).exists()
-        return False
+        return obj.id in get_relation_ids(
+            self.context.get("request"), FAVORITES
+        )
 
     def _create_ingredients(self, recipe, ingredients_data):
         ingredients_to_create = [
@@ -233,16 +296,26 @@ class RecipeSerializer(serializers.ModelSerializer):
         ]
         RecipeIngredient.objects.bulk_create(ingredients_to_create)
 
+    def _set_tags(self, recipe, tags):
+        RecipeTag.objects.filter(recipe=recipe).delete()
+        RecipeTag.objects.bulk_create(
+            RecipeTag(recipe=recipe, tag=tag) for tag in tags
+        )
+
     @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop(
             "ingredients_for_processing"
         )
+        tags = validated_data.pop("tags_for_processing", [])
 
         validated_data["author"] = self.context["request"].user
         recipe = Recipe.objects.create(**validated_data)
 
         self._create_ingredients(recipe, ingredients_data)
+        self._set_tags(recipe, tags)
+        recompute_recipe_nutrition([recipe.id])
+        record_revision(recipe)
 
         return recipe
 
@@ -252,6 +325,9 @@ class RecipeSerializer(serializers.ModelSerializer):
             "ingredients_for_processing",
             None
         )
+        tags = validated_data.pop("tags_for_processing", None)
+        lock_recipe(instance)
+        before = recipe_state(instance)
 
         for field in ("name", "text", "cooking_time", "image"):
             if field in validated_data:
@@ -262,11 +338,211 @@ class RecipeSerializer(serializers.ModelSerializer):
         if ingredients_data is not None:
             instance.recipe_ingredients.all().delete()
             self._create_ingredients(instance, ingredients_data)
+            recompute_recipe_nutrition([instance.id])
+        if tags is not None:
+            self._set_tags(instance, tags)
 
+        record_revision(instance, before)
         return instance
 
 
-class ShortRecipeSerializer(serializers.ModelSerializer):
+class RecipeRevisionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RecipeRevision
+        fields = ("number", "is_snapshot", "created_at")
+        read_only_fields = fields
+
+
+class RecipeNutritionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RecipeNutrition
+        fields = ("kcal", "protein", "fat", "carbohydrates", "cost")
+        read_only_fields = fields
+
+
+class RecipeListSerializer:
+    field_names = (
+        "id",
+        "name",
+        "author",
+        "cooking_time",
+        "image",
+        "is_favorited",
+        "is_in_shopping_cart",
+        "text",
+        "tags",
+        "ingredients",
+    )
+    author_field_names = (
+        "id",
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "avatar",
+        "is_subscribed",
+    )
+    ingredient_field_names = ("id", "name", "amount", "measurement_unit")
+    tag_field_names = ("id", "name", "slug")
+    recipe_columns = ("name", "cooking_time", "image", "text")
+    author_columns = ("username", "email", "first_name", "last_name", "avatar")
+
+    def __init__(self, rows, context=None, fieldset=None):
+        self.rows = rows
+        self.context = context or {}
+        self.fieldset = fieldset
+
+    @classmethod
+    def get_values_fields(cls, fieldset=None):
+        values = ["id", "author_id"]
+        values += [
+            name for name in cls.recipe_columns if selects(fieldset, name)
+        ]
+
+        if selects(fieldset, "author") and not collapses(fieldset, "author"):
+            author = nested_fieldset(fieldset, "author")
+            values += [
+                f"author__{name}" for name in cls.author_columns
+                if selects(author, name)
+            ]
+
+        return values
+
+    def _file_url(self, name):
+        if not name:
+            return None
+
+        url = default_storage.url(name)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def _ingredients(self, recipe_ids):
+        ingredients = {recipe_id: [] for recipe_id in recipe_ids}
+        queryset = RecipeIngredient.objects.filter(recipe_id__in=recipe_ids)
+
+        if collapses(self.fieldset, "ingredients"):
+            for recipe_id, ingredient_id in queryset.values_list(
+                "recipe_id", "ingredient_id"
+            ):
+                ingredients[recipe_id].append(ingredient_id)
+            return ingredients
+
+        fieldset = nested_fieldset(self.fieldset, "ingredients")
+        names = [
+            name for name in self.ingredient_field_names
+            if selects(fieldset, name)
+        ]
+        rows = queryset.values_list(
+            "recipe_id",
+            "ingredient_id",
+            "ingredient__name",
+            "amount",
+            "ingredient__measurement_unit",
+        )
+
+        for recipe_id, ingredient_id, name, amount, unit in rows:
+            item = {
+                "id": ingredient_id,
+                "name": name,
+                "amount": amount,
+                "measurement_unit": unit,
+            }
+            ingredients[recipe_id].append(
+                item if fieldset is None
+                else {name: item[name] for name in names}
+            )
+
+        return ingredients
+
+    def _tags(self, recipe_ids):
+        tags = {recipe_id: [] for recipe_id in recipe_ids}
+        queryset = RecipeTag.objects.filter(
+            recipe_id__in=recipe_ids
+        ).order_by("tag__name")
+
+        if collapses(self.fieldset, "tags"):
+            for recipe_id, tag_id in queryset.values_list(
+                "recipe_id", "tag_id"
+            ):
+                tags[recipe_id].append(tag_id)
+            return tags
+
+        fieldset = nested_fieldset(self.fieldset, "tags")
+        names = [
+            name for name in self.tag_field_names if selects(fieldset, name)
+        ]
+        for recipe_id, *values in queryset.values_list(
+            "recipe_id", "tag_id", "tag__name", "tag__slug"
+        ):
+            tag = dict(zip(self.tag_field_names, values))
+            tags[recipe_id].append({name: tag[name] for name in names})
+
+        return tags
+
+    def _author_getter(self, request):
+        if collapses(self.fieldset, "author"):
+            return itemgetter("author_id")
+
+        fieldset = nested_fieldset(self.fieldset, "author")
+        following = (get_relation_ids(request, FOLLOWING)
+                     if selects(fieldset, "is_subscribed") else frozenset())
+        getters = {
+            "id": itemgetter("author_id"),
+            "username": itemgetter("author__username"),
+            "email": itemgetter("author__email"),
+            "first_name": itemgetter("author__first_name"),
+            "last_name": itemgetter("author__last_name"),
+            "avatar": lambda row: self._file_url(row["author__avatar"]),
+            "is_subscribed": lambda row: row["author_id"] in following,
+        }
+        getters = [
+            (name, getters[name]) for name in self.author_field_names
+            if selects(fieldset, name)
+        ]
+
+        return lambda row: {name: get(row) for name, get in getters}
+
+    @property
+    def data(self):
+        rows = list(self.rows)
+        if not rows:
+            return []
+
+        request = self.context.get("request")
+        names = [
+            name for name in self.field_names
+            if selects(self.fieldset, name)
+        ]
+        getters = {
+            "id": itemgetter("id"),
+            "name": itemgetter("name"),
+            "cooking_time": itemgetter("cooking_time"),
+            "image": lambda row: self._file_url(row["image"]),
+            "text": itemgetter("text"),
+        }
+
+        if "author" in names:
+            getters["author"] = self._author_getter(request)
+        if "is_favorited" in names:
+            favorites = get_relation_ids(request, FAVORITES)
+            getters["is_favorited"] = lambda row: row["id"] in favorites
+        if "is_in_shopping_cart" in names:
+            shopping_cart = get_relation_ids(request, SHOPPING_CART)
+            getters["is_in_shopping_cart"] = (
+                lambda row: row["id"] in shopping_cart
+            )
+        if "tags" in names:
+            tags = self._tags([row["id"] for row in rows])
+            getters["tags"] = lambda row: tags[row["id"]]
+        if "ingredients" in names:
+            ingredients = self._ingredients([row["id"] for row in rows])
+            getters["ingredients"] = lambda row: ingredients[row["id"]]
+
+        getters = [(name, getters[name]) for name in names]
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+
+class ShortRecipeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     image = serializers.ImageField(read_only=True)
 
     class Meta:
@@ -275,7 +551,7 @@ class ShortRecipeSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class RecipesUserSerializer(serializers.ModelSerializer):
+class RecipesUserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     avatar = serializers.ImageField(
         read_only=True,
         required=False,
@@ -301,9 +577,9 @@ class RecipesUserSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
     def get_is_subscribed(self, obj):
-        request = self.context.get("request")
-        return (request and request.user.is_authenticated
-                and request.user.follower.filter(author=obj).exists())
+        return obj.id in get_relation_ids(
+            self.context.get("request"), FOLLOWING
+        )
 
     def get_recipes(self, obj):
         request = self.context.get("request")
@@ -320,11 +596,46 @@ class RecipesUserSerializer(serializers.ModelSerializer):
                 except ValueError as e:
                     print(e)
                     pass
+
+        fieldset = self.get_fieldset()
+        if collapses(fieldset, "recipes"):
+            return list(queryset.values_list("id", flat=True))
+
         return ShortRecipeSerializer(
             queryset,
             many=True,
-            context=self.context
+            context=self.context,
+            fieldset=nested_fieldset(fieldset, "recipes"),
         ).data
 
     def get_recipes_count(self, obj):
         return obj.recipes.count()
+
+
+class MealPlanEntrySerializer(serializers.ModelSerializer):
+    recipe = serializers.PrimaryKeyRelatedField(
+        queryset=Recipe.objects.all()
+    )
+    servings = serializers.DecimalField(
+        max_digits=SERVINGS_MAX_DIGITS,
+        decimal_places=SERVINGS_DECIMAL_PLACES,
+        min_value=MIN_SERVINGS,
+        required=False,
+    )
+
+    class Meta:
+        model = MealPlanEntry
+        fields = ("id", "date", "recipe", "servings")
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        representation["recipe"] = ShortRecipeSerializer(
+            instance.recipe,
+            context=self.context,
+            fieldset=None,
+        ).data
+        return representation
+
+    def create(self, validated_data):
+        validated_data["user"] = self.context["request"].user
+        return super().create(validated_data)
@@ -0,0 +1,82 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_tokens, invalidate_user_tokens
+from .catalog import schedule_catalog_refresh
+from .models import (
+    Favorite,
+    Follow,
+    Ingredient,
+    ShoppingCartItem,
+    Tag,
+    User,
+)
+from .relations import (
+    FAVORITES,
+    FOLLOWING,
+    SHOPPING_CART,
+    bump_embedded_version,
+    bump_version,
+)
+
+LOGIN_FIELDS = frozenset({"last_login"})
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_tokens(instance.key))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    if not created:
+        transaction.on_commit(lambda: invalidate_user_tokens(instance.pk))
+    # Recipes embed author profiles; a login alone changes none of it.
+    if not created and not (update_fields and update_fields <= LOGIN_FIELDS):
+        bump_embedded_version()
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def embedded_changed(sender, **kwargs):
+    bump_embedded_version()
+
+
+def _recipe_users_changed(kind, field_name):
+    def handler(sender, instance, action, reverse, pk_set, **kwargs):
+        if reverse:
+            if action in ("post_add", "post_remove", "post_clear"):
+                bump_version(kind, instance.pk)
+        elif action == "pre_clear":
+            instance._cleared_user_ids = list(
+                getattr(instance, field_name).values_list("id", flat=True)
+            )
+        elif action == "post_clear":
+            bump_version(kind, *instance.__dict__.pop("_cleared_user_ids", []))
+        elif action in ("post_add", "post_remove"):
+            bump_version(kind, *pk_set)
+
+    return handler
+
+
+favorites_changed = _recipe_users_changed(FAVORITES, "favorited_by")
+shopping_cart_changed = _recipe_users_changed(
+    SHOPPING_CART, "in_shopping_cart_for_users"
+)
+m2m_changed.connect(favorites_changed, sender=Favorite)
+m2m_changed.connect(shopping_cart_changed, sender=ShoppingCartItem)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    bump_version(FOLLOWING, instance.user_id)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, instance, **kwargs):
+    schedule_catalog_refresh()
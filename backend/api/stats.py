@@ -0,0 +1,132 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    AuthorDailyStats,
+    Favorite,
+    Follow,
+    RecipeDailyStats,
+    ShoppingCartItem,
+)
+
+RECIPE_SOURCES = (
+    (Favorite, "favorites"),
+    (ShoppingCartItem, "shopping_carts"),
+)
+STATS_FIELDS = ("followers", "favorites", "shopping_carts")
+TOP_RECIPES = 10
+
+
+def day_start(date):
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+def _daily_counts(queryset, start, end, *group_by):
+    return (
+        queryset.filter(created_at__gte=day_start(start),
+                        created_at__lt=day_start(end + timedelta(days=1)))
+        .annotate(day=TruncDate("created_at"))
+        .values_list(*group_by, "day")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+
+
+def first_pending_day():
+    last = AuthorDailyStats.objects.aggregate(date=Max("date"))["date"]
+    if last is not None:
+        return last
+
+    starts = [
+        model.objects.aggregate(created_at=Min("created_at"))["created_at"]
+        for model in (Favorite, ShoppingCartItem, Follow)
+    ]
+    starts = [start for start in starts if start is not None]
+    return timezone.localdate(min(starts)) if starts else None
+
+
+@transaction.atomic
+def aggregate_stats(start=None, end=None):
+    start = start or first_pending_day()
+    end = end or timezone.localdate()
+    if start is None or start > end:
+        return 0
+
+    recipes = defaultdict(dict)
+    authors = defaultdict(dict)
+    for model, field in RECIPE_SOURCES:
+        rows = _daily_counts(
+            model.objects.all(), start, end, "recipe_id", "recipe__author_id"
+        )
+        for recipe_id, author_id, day, total in rows:
+            recipes[recipe_id, day][field] = total
+            stats = authors[author_id, day]
+            stats[field] = stats.get(field, 0) + total
+
+    for author_id, day, total in _daily_counts(
+        Follow.objects.all(), start, end, "author_id"
+    ):
+        authors[author_id, day]["followers"] = total
+
+    RecipeDailyStats.objects.filter(date__range=(start, end)).delete()
+    AuthorDailyStats.objects.filter(date__range=(start, end)).delete()
+    RecipeDailyStats.objects.bulk_create(
+        (
+            RecipeDailyStats(recipe_id=recipe_id, date=day, **counts)
+            for (recipe_id, day), counts in recipes.items()
+        ),
+        batch_size=1_000,
+    )
+    AuthorDailyStats.objects.bulk_create(
+        (
+            AuthorDailyStats(author_id=author_id, date=day, **counts)
+            for (author_id, day), counts in authors.items()
+        ),
+        batch_size=1_000,
+    )
+    return (end - start).days + 1
+
+
+def author_stats(user, days, recipe_id=None):
+    since = timezone.localdate() - timedelta(days=days - 1)
+    daily = list(
+        AuthorDailyStats.objects.filter(author=user, date__gte=since)
+        .order_by("date").values("date", *STATS_FIELDS)
+    )
+    top_recipes = list(
+        RecipeDailyStats.objects.filter(recipe__author=user, date__gte=since)
+        .values("recipe_id", "recipe__name")
+        .annotate(favorites=Sum("favorites"),
+                  shopping_carts=Sum("shopping_carts"))
+        .order_by("-favorites", "-shopping_carts", "recipe_id")
+        [:TOP_RECIPES]
+    )
+    stats = {
+        "since": since,
+        "followers": Follow.objects.filter(author=user).count(),
+        "totals": {
+            field: sum(row[field] for row in daily) for field in STATS_FIELDS
+        },
+        "daily": daily,
+        "top_recipes": [
+            {
+                "id": row["recipe_id"],
+                "name": row["recipe__name"],
+                "favorites": row["favorites"],
+                "shopping_carts": row["shopping_carts"],
+            }
+            for row in top_recipes
+        ],
+    }
+    if recipe_id is not None:
+        stats["recipe"] = list(
+            RecipeDailyStats.objects.filter(
+                recipe_id=recipe_id, recipe__author=user, date__gte=since
+            ).order_by("date").values("date", "favorites", "shopping_carts")
+        )
+    return stats
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import posixpath
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import models
+from django.utils.functional import cached_property
+
+HASH_PREFIX_LENGTH = 2
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+
+        hexdigest = digest.hexdigest()
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(
+            directory, hexdigest[:HASH_PREFIX_LENGTH], hexdigest + extension
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        try:
+            name = self.content_name(name, content)
+            if self.exists(name):
+                # Refresh the mtime so garbage collection leaves the file
+                # alone until the row pointing at it has been committed.
+                os.utime(self.path(name))
+                return name
+            return super().save(name, content, max_length)
+        finally:
+            if hasattr(content, "temporary_file_path"):
+                content.close()
+
+
+class ExportStorage(FileSystemStorage):
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.EXPORT_ROOT)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == "EXPORT_ROOT":
+            self.__dict__.pop("base_location", None)
+            self.__dict__.pop("location", None)
+
+
+export_storage = ExportStorage()
+
+
+def file_fields():
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+def count_references(names=None):
+    references = Counter()
+    for model, field in file_fields():
+        queryset = model._base_manager.exclude(**{field.name: ""})
+        if names is not None:
+            queryset = queryset.filter(**{f"{field.name}__in": names})
+        references.update(
+            queryset.values_list(field.name, flat=True).iterator()
+        )
+    return references
+
+
+def upload_roots():
+    return {
+        field.upload_to.strip("/")
+        for _, field in file_fields()
+        if isinstance(field.upload_to, str) and field.upload_to
+    }
+
+
+def stored_files(directory):
+    directories, files = default_storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name)
+    for name in directories:
+        yield from stored_files(posixpath.join(directory, name))
+
+
+def is_settled(name, now=None):
+    age = (now or time.time()) - os.path.getmtime(default_storage.path(name))
+    return age >= settings.MEDIA_GC_GRACE_PERIOD
+
+
+def release_files(names):
+    names = {name for name in names if name}
+    references = count_references(names)
+    released = [
+        name for name in names
+        if not references[name]
+        and default_storage.exists(name)
+        and is_settled(name)
+    ]
+    for name in released:
+        default_storage.delete(name)
+    return released
+
+
+def orphaned_files():
+    references = count_references()
+    now = time.time()
+    for root in sorted(upload_roots()):
+        if not default_storage.exists(root):
+            continue
+        for name in stored_files(root):
+            if not references[name] and is_settled(name, now):
+                yield name
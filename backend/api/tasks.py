@@ -0,0 +1,55 @@
+import time
+from datetime import date
+
+from django.core.files.storage import default_storage
+
+from .deletion import delete_user
+from .export import build_export, expired_exports
+from .jobs import report_progress, task
+from .models import User
+from .recommendations import rebuild_similarities
+from .stats import aggregate_stats
+from .storage import export_storage, orphaned_files, release_files
+
+PROGRESS_STEP = 100
+
+
+@task("release_files")
+def release_files_task(job, names):
+    release_files(names)
+
+
+@task("delete_user")
+def delete_user_task(job, user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if user is not None:
+        delete_user(user)
+
+
+# A failed export is reported to the user, who retries it from the API.
+@task("build_export", max_attempts=1)
+def build_export_task(job, user_id):
+    build_export(user_id)
+
+
+@task("rebuild_similarities")
+def rebuild_similarities_task(job, top_k=None, full=False):
+    rebuild_similarities(top_k=top_k, full=full)
+
+
+@task("aggregate_stats")
+def aggregate_stats_task(job, since=None):
+    aggregate_stats(date.fromisoformat(since) if since else None)
+
+
+@task("collect_media_garbage")
+def collect_media_garbage_task(job):
+    names = [
+        *((default_storage, name) for name in orphaned_files()),
+        *((export_storage, name) for name in expired_exports(time.time())),
+    ]
+    report_progress(job, 0, len(names))
+    for removed, (storage, name) in enumerate(names, 1):
+        storage.delete(name)
+        if removed % PROGRESS_STEP == 0 or removed == len(names):
+            report_progress(job, removed)
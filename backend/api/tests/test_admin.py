@@ -0,0 +1,36 @@
+from django.test import TestCase
+
+from api.models import Follow, User
+
+
+class UserInputFilterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="x",
+        )
+        cls.cook, cls.fan = (
+            User.objects.create_user(
+                username=name, email=f"{name}@example.com", password="x",
+            )
+            for name in ("cook", "fan")
+        )
+        Follow.objects.create(user=cls.fan, author=cls.cook)
+        Follow.objects.create(user=cls.cook, author=cls.admin)
+
+    def filtered(self, query):
+        self.client.force_login(self.admin)
+        response = self.client.get(f"/admin/api/follow/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return list(response.context["cl"].result_list)
+
+    def test_filters_by_either_side(self):
+        self.assertEqual(
+            self.filtered("user=fan@example.com"),
+            list(Follow.objects.filter(user=self.fan)),
+        )
+        self.assertEqual(
+            self.filtered(f"author={self.admin.pk}"),
+            list(Follow.objects.filter(author=self.admin)),
+        )
+        self.assertEqual(self.filtered("user=cook&author=cook"), [])
@@ -0,0 +1,45 @@
+import json
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.catalog import snapshot_path
+from api.models import Ingredient
+
+
+class CatalogSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(INGREDIENTS_SNAPSHOT_ROOT=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def snapshot_names(self):
+        return [
+            item["name"]
+            for item in json.loads(snapshot_path().read_bytes())
+        ]
+
+    def test_changes_rebuild_snapshot_once_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for name in ("мука", "соль", "сахар"):
+                Ingredient.objects.create(name=name, measurement_unit="г")
+            self.assertFalse(snapshot_path().exists())
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertCountEqual(self.snapshot_names(), ["мука", "соль", "сахар"])
+
+    def test_bulk_delete_rebuilds_snapshot_once(self):
+        Ingredient.objects.bulk_create(
+            Ingredient(name=name, measurement_unit="г")
+            for name in ("мука", "соль", "сахар")
+        )
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Ingredient.objects.filter(name__in=["мука", "соль"]).delete()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.snapshot_names(), ["сахар"])
@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from api.models import Recipe, User
+
+FAR_FUTURE = http_date(4_000_000_000)
+
+
+@override_settings(SHARED_CACHE=True)
+class RecipeConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="reader", email="reader@example.com", password="x",
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.user, name="Суп", text="Описание",
+            cooking_time=10, image="recipes/images/soup.png",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assert_refreshed_after_favorite(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Last-Modified", response)
+        etag = response["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/api/recipes/{self.recipe.pk}/favorite/")
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=FAR_FUTURE)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+    def test_list_is_not_validated_by_date(self):
+        self.assert_refreshed_after_favorite("/api/recipes/")
+
+    def test_detail_is_not_validated_by_date(self):
+        self.assert_refreshed_after_favorite(f"/api/recipes/{self.recipe.pk}/")
+
+    def test_unchanged_list_answers_not_modified(self):
+        etag = self.client.get("/api/recipes/")["ETag"]
+        response = self.client.get("/api/recipes/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
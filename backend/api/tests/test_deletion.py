@@ -0,0 +1,109 @@
+from django.db import connection
+from django.test import TestCase
+
+from api.deletion import delete_recipes, delete_user
+from api.models import (
+    Favorite,
+    Ingredient,
+    Job,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCartItem,
+    User,
+)
+
+FAVORITES = 10_000
+
+
+class BulkDeletionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cook = User.objects.create_user(
+            username="cook", email="cook@example.com", password="x",
+            avatar="users/avatars/cook.png",
+        )
+        cls.fan = User.objects.create_user(
+            username="fan", email="fan@example.com", password="x",
+        )
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=cls.cook,
+                name=f"Рецепт {index}",
+                text="Описание",
+                cooking_time=10,
+                time_bucket="quick",
+                image=f"recipes/images/{index}.png",
+            )
+            for index in range(FAVORITES)
+        )
+        recipe_ids = list(Recipe.objects.values_list("id", flat=True))
+        ingredient = Ingredient.objects.create(
+            name="соль", measurement_unit="г"
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe_id=recipe_id, ingredient=ingredient, amount=1
+            )
+            for recipe_id in recipe_ids
+        )
+        Favorite.objects.bulk_create(
+            Favorite(user=cls.fan, recipe_id=recipe_id)
+            for recipe_id in recipe_ids
+        )
+        ShoppingCartItem.objects.bulk_create(
+            ShoppingCartItem(user=cls.fan, recipe_id=recipe_id)
+            for recipe_id in recipe_ids[:100]
+        )
+
+    def test_delete_user_with_many_favorites(self):
+        with self.assertNumQueries(17):
+            delete_user(self.fan)
+
+        self.assertFalse(User.objects.filter(pk=self.fan.pk).exists())
+        self.assertFalse(Favorite.objects.exists())
+        self.assertFalse(ShoppingCartItem.objects.exists())
+        self.assertEqual(Recipe.objects.count(), FAVORITES)
+
+    def test_delete_author_with_many_favorited_recipes(self):
+        with self.assertNumQueries(29):
+            delete_user(self.cook)
+
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(Favorite.objects.exists())
+        self.assertFalse(RecipeIngredient.objects.exists())
+        job = Job.objects.get(name="release_files")
+        self.assertEqual(len(job.payload["names"]), FAVORITES + 1)
+
+    def test_delete_recipes_with_many_favorites(self):
+        params = []
+
+        def record(execute, sql, values, many, context):
+            params.append(len(values or ()))
+            return execute(sql, values, many, context)
+
+        with self.assertNumQueries(15), connection.execute_wrapper(record):
+            delete_recipes(Recipe.objects.filter(author=self.cook))
+
+        self.assertLess(max(params), 100)
+
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(Favorite.objects.exists())
+        self.assertFalse(ShoppingCartItem.objects.exists())
+        self.assertTrue(User.objects.filter(pk=self.cook.pk).exists())
+
+    def test_admin_schedules_large_account_deletion(self):
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="x",
+        )
+        self.client.force_login(admin)
+
+        response = self.client.post(
+            f"/admin/api/user/{self.fan.pk}/delete/", {"post": "yes"}
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.fan.refresh_from_db()
+        self.assertFalse(self.fan.is_active)
+        self.assertEqual(Favorite.objects.count(), FAVORITES)
+        job = Job.objects.get(name="delete_user")
+        self.assertEqual(job.payload, {"user_id": self.fan.pk})
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.events import HANDLERS, consume, prune_events, record
+from api.models import OutboxCheckpoint, OutboxEvent
+
+
+class ConsumeTest(TestCase):
+    def setUp(self):
+        self.delivered = []
+        handlers = mock.patch.dict(HANDLERS, {None: [self.deliver]})
+        handlers.start()
+        self.addCleanup(handlers.stop)
+
+    def deliver(self, events):
+        self.delivered.extend(event.id for event in events)
+
+    def record(self, count):
+        return [
+            record("favorite_added", 1, index).id for index in range(count)
+        ]
+
+    def checkpoint(self):
+        return OutboxCheckpoint.objects.get(consumer="default")
+
+    def test_batches_advance_the_checkpoint(self):
+        ids = self.record(3)
+
+        self.assertEqual(consume(batch_size=2), 2)
+        self.assertEqual(self.checkpoint().position, ids[1])
+        self.assertEqual(consume(batch_size=2), 1)
+        self.assertEqual(consume(batch_size=2), 0)
+
+        self.assertEqual(self.delivered, ids)
+        self.assertEqual(self.checkpoint().position, ids[2])
+
+    def test_late_commit_below_checkpoint_is_delivered(self):
+        first, late, last = self.record(3)
+        consume(batch_size=1)
+        event = OutboxEvent.objects.get(pk=late)
+        event.delete()
+
+        consume()
+        self.assertEqual(self.checkpoint().gaps, {str(late): mock.ANY})
+
+        event.pk = late
+        event.save(force_insert=True)
+        self.assertEqual(consume(), 1)
+        self.assertEqual(self.delivered, [first, last, late])
+        self.assertEqual(self.checkpoint().gaps, {})
+
+    def test_gaps_expire(self):
+        first, missing, last = self.record(3)
+        consume(batch_size=1)
+        OutboxEvent.objects.filter(pk=missing).delete()
+        consume()
+
+        with override_settings(OUTBOX_GAP_TIMEOUT=-1):
+            self.assertEqual(consume(), 0)
+
+        self.assertEqual(self.checkpoint().gaps, {})
+        self.assertEqual(self.delivered, [first, last])
+
+    def test_failed_handler_keeps_the_batch(self):
+        self.record(2)
+
+        with mock.patch.dict(HANDLERS, {None: [mock.Mock(
+            side_effect=RuntimeError
+        )]}), self.assertRaises(RuntimeError):
+            consume()
+
+        self.assertFalse(OutboxCheckpoint.objects.exists())
+        self.assertEqual(consume(), 2)
+
+    def test_command_retries_with_backoff(self):
+        with mock.patch(
+            "api.management.commands.consume_events.consume",
+            side_effect=[RuntimeError, RuntimeError, 3, KeyboardInterrupt],
+        ), mock.patch(
+            "api.management.commands.consume_events.time.sleep"
+        ) as sleep, mock.patch(
+            "api.management.commands.consume_events.logger"
+        ) as logger:
+            out = StringIO()
+            call_command("consume_events", interval=1, stdout=out)
+
+        self.assertEqual(logger.exception.call_count, 2)
+        self.assertEqual(sleep.call_args_list, [mock.call(2), mock.call(4)])
+        self.assertIn("Обработано событий: 3", out.getvalue())
+
+
+class PruneEventsTest(TestCase):
+    def test_keeps_events_not_yet_consumed_or_recent(self):
+        old, consumed_recent, pending = (
+            record("favorite_added", 1, index).id for index in range(3)
+        )
+        OutboxEvent.objects.filter(pk__in=[old, pending]).update(
+            created_at=timezone.now() - timedelta(days=31)
+        )
+        OutboxCheckpoint.objects.create(consumer="a", position=pending)
+        OutboxCheckpoint.objects.create(consumer="b", position=consumed_recent)
+
+        self.assertEqual(prune_events(), 1)
+
+        self.assertEqual(
+            list(OutboxEvent.objects.order_by("id").values_list(
+                "id", flat=True
+            )),
+            [consumed_recent, pending],
+        )
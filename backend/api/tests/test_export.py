@@ -0,0 +1,126 @@
+import io
+import tempfile
+import zipfile
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.jobs import work
+from api.models import DataExport, Job, User
+
+EXPORT_URL = "/api/users/me/export/"
+DOWNLOAD_URL = "/api/users/me/export/download/"
+
+
+class BackgroundExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="owner", email="owner@example.com", password="x",
+        )
+        cls.stranger = User.objects.create_user(
+            username="stranger", email="stranger@example.com", password="x",
+        )
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            EXPORT_ASYNC_THRESHOLD=0, EXPORT_ROOT=directory.name
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_export_is_tracked_and_served_to_its_owner(self):
+        for _ in range(2):
+            response = self.client.get(EXPORT_URL)
+            self.assertEqual(response.status_code, 202, response.content)
+            self.assertEqual(response.json(), {"status": "pending"})
+        self.assertEqual(Job.objects.filter(name="build_export").count(), 1)
+        self.assertEqual(self.client.get(DOWNLOAD_URL).status_code, 404)
+
+        work(once=True)
+
+        response = self.client.get(EXPORT_URL)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(response.json()["url"].endswith(DOWNLOAD_URL))
+
+        response = self.client.get(DOWNLOAD_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "private, no-store")
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response)))
+        self.assertIn("profile.ndjson", archive.namelist())
+
+        self.client.force_authenticate(self.stranger)
+        self.assertEqual(self.client.get(DOWNLOAD_URL).status_code, 404)
+
+    def test_download_is_handed_to_nginx_when_configured(self):
+        self.client.get(EXPORT_URL)
+        work(once=True)
+        archive = DataExport.objects.get(user=self.user).archive
+
+        with override_settings(EXPORT_ACCEL_REDIRECT="/protected-exports/"):
+            response = self.client.get(DOWNLOAD_URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected-exports/{archive}"
+        )
+        self.assertEqual(response.content, b"")
+
+    def test_failed_export_is_scheduled_again(self):
+        self.client.get(EXPORT_URL)
+        Job.objects.update(state=Job.FAILED)
+
+        response = self.client.get(EXPORT_URL)
+
+        self.assertEqual(response.status_code, 202)
+        export = DataExport.objects.get(user=self.user)
+        self.assertEqual(export.job.state, Job.QUEUED)
+        self.assertEqual(Job.objects.filter(name="build_export").count(), 2)
+
+
+class ExportModeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            MEDIA_ROOT=directory.name, EXPORT_ASYNC_MEDIA_SIZE=1_000
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.user = User.objects.create_user(
+            username="owner", email="owner@example.com", password="x",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def set_avatar(self, size):
+        self.user.avatar = default_storage.save(
+            "users/avatar.png", ContentFile(b"x" * size)
+        )
+        self.user.save(update_fields=["avatar"])
+
+    def test_small_account_is_streamed(self):
+        self.set_avatar(100)
+
+        response = self.client.get(EXPORT_URL)
+
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response)))
+        self.assertIn(f"media/{self.user.avatar.name}", archive.namelist())
+
+    def test_large_media_is_exported_in_background(self):
+        self.set_avatar(1_000)
+
+        response = self.client.get(EXPORT_URL)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(Job.objects.filter(name="build_export").exists())
@@ -0,0 +1,55 @@
+import base64
+import io
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from api.fields import DECODE_CHUNK_SIZE, BoundedBase64ImageField
+
+
+class BoundedBase64ImageFieldTest(SimpleTestCase):
+    def setUp(self):
+        image = Image.frombytes("RGB", (200, 200), os.urandom(200 * 200 * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        self.content = buffer.getvalue()
+
+    def test_accepts_line_wrapped_base64(self):
+        encoded = base64.encodebytes(self.content).decode()
+        self.assertGreater(len(encoded), DECODE_CHUNK_SIZE * 2)
+
+        upload = BoundedBase64ImageField().to_internal_value(
+            f"data:image/png;base64,{encoded}"
+        )
+
+        self.assertTrue(upload.name.endswith(".png"))
+        self.assertEqual(upload.read(), self.content)
+
+    def test_rejects_oversized_payload_before_decoding(self):
+        encoded = base64.b64encode(self.content).decode()
+
+        limit = override_settings(MAX_UPLOAD_SIZE=len(self.content) - 1)
+        with limit, mock.patch.object(
+            BoundedBase64ImageField, "decode"
+        ) as decode, self.assertRaisesMessage(
+            ValidationError, "Размер изображения"
+        ):
+            BoundedBase64ImageField().to_internal_value(encoded)
+
+        decode.assert_not_called()
+
+    def test_rejects_too_many_pixels(self):
+        encoded = base64.b64encode(self.content).decode()
+
+        with override_settings(MAX_IMAGE_PIXELS=199 * 200), \
+                self.assertRaisesMessage(ValidationError, "пикселей"):
+            BoundedBase64ImageField().to_internal_value(encoded)
+
+    def test_rejects_truncated_payload(self):
+        encoded = base64.b64encode(self.content).decode()[:-1]
+
+        with self.assertRaises(ValidationError):
+            BoundedBase64ImageField().to_internal_value(encoded)
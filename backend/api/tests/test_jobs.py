@@ -0,0 +1,103 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.jobs import (
+    TASKS,
+    Task,
+    claim,
+    enqueue,
+    requeue_stale_jobs,
+    run_job,
+    work,
+)
+from api.models import Job
+
+
+@override_settings(JOB_RETRY_DELAY=30, JOB_MAX_ATTEMPTS=3)
+class JobQueueTest(TestCase):
+    def setUp(self):
+        tasks = mock.patch.dict(TASKS, {
+            "ok": Task(lambda job, **payload: None, None),
+            "broken": Task(mock.Mock(side_effect=RuntimeError), None),
+        })
+        tasks.start()
+        self.addCleanup(tasks.stop)
+        logger = mock.patch("api.jobs.logger")
+        logger.start()
+        self.addCleanup(logger.stop)
+
+    def test_claim_takes_due_jobs_once(self):
+        later = enqueue("ok", delay=60)
+        due = enqueue("ok", value=1)
+
+        job = claim("a")
+
+        self.assertEqual(job.pk, due.pk)
+        self.assertEqual(
+            (job.state, job.worker, job.attempts), (Job.RUNNING, "a", 1)
+        )
+        self.assertIsNone(claim("b"))
+        self.assertEqual(Job.objects.get(pk=later.pk).state, Job.QUEUED)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = enqueue("broken")
+
+        delays = []
+        for _ in range(2):
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+            before = timezone.now()
+            self.assertEqual(run_job(claim("a")), Job.QUEUED)
+            job.refresh_from_db()
+            delays.append((job.run_at - before).total_seconds())
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(run_job(claim("a")), Job.FAILED)
+
+        self.assertAlmostEqual(delays[0], 30, delta=1)
+        self.assertAlmostEqual(delays[1], 60, delta=1)
+        job.refresh_from_db()
+        self.assertEqual((job.attempts, job.worker), (3, ""))
+        self.assertIn("RuntimeError", job.error)
+
+    def stale(self, attempts):
+        job = enqueue("ok")
+        Job.objects.filter(pk=job.pk).update(
+            state=Job.RUNNING, worker="gone", attempts=attempts,
+            heartbeat_at=timezone.now() - timedelta(hours=1),
+        )
+        return job
+
+    def test_stale_jobs_are_requeued_or_failed(self):
+        requeued = self.stale(attempts=1)
+        exhausted = self.stale(attempts=3)
+        enqueue("ok")
+        claim("alive")
+
+        self.assertEqual(requeue_stale_jobs(), 2)
+
+        requeued.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual((requeued.state, requeued.worker), (Job.QUEUED, ""))
+        self.assertEqual(exhausted.state, Job.FAILED)
+        self.assertEqual(Job.objects.filter(worker="alive").count(), 1)
+
+    def test_worker_recovers_stale_jobs_while_busy(self):
+        stale = self.stale(attempts=1)
+        enqueue("ok")
+
+        self.assertEqual(work(once=True), 2)
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.state, Job.SUCCEEDED)
+
+    def test_late_result_does_not_overwrite_new_run(self):
+        enqueue("ok")
+        job = claim("slow")
+        Job.objects.filter(pk=job.pk).update(worker="fresh")
+
+        self.assertIsNone(run_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.worker), (Job.RUNNING, "fresh"))
@@ -0,0 +1,45 @@
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import MealPlanEntry, OutboxEvent, Recipe, User
+
+
+class ApplyToCartTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="planner", email="planner@example.com", password="x",
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                author=cls.user, name=f"Рецепт {index}", text="Описание",
+                cooking_time=10, image=f"recipes/images/{index}.png",
+            )
+            for index in range(3)
+        ]
+        for recipe in cls.recipes:
+            MealPlanEntry.objects.create(
+                user=cls.user, recipe=recipe, date=date(2026, 10, 19)
+            )
+
+    def test_records_events_for_newly_added_recipes(self):
+        self.user.shopping_cart_recipes.add(self.recipes[0])
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post("/api/meal-plan/apply_to_cart/")
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            set(self.user.shopping_cart_recipes.values_list("pk", flat=True)),
+            {recipe.pk for recipe in self.recipes},
+        )
+        self.assertEqual(
+            sorted(OutboxEvent.objects.filter(
+                event_type=OutboxEvent.SHOPPING_CART_ADDED,
+                user_id=self.user.pk,
+            ).values_list("object_id", flat=True)),
+            [recipe.pk for recipe in self.recipes[1:]],
+        )
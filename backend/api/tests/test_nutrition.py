@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from api.models import (
+    Ingredient,
+    IngredientNutrition,
+    Recipe,
+    RecipeIngredient,
+    RecipeNutrition,
+    User,
+)
+from api.nutrition import cart_totals, recompute_recipe_nutrition
+
+
+class NutritionCoverageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="x",
+        )
+        cls.flour = Ingredient.objects.create(
+            name="мука", measurement_unit="г"
+        )
+        cls.salt = Ingredient.objects.create(
+            name="соль", measurement_unit="г"
+        )
+        IngredientNutrition.objects.create(
+            ingredient=cls.flour, kcal=3, protein=Decimal("0.1"),
+            fat=0, carbohydrates=Decimal("0.7"),
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.user, name="Хлеб", text="Описание",
+            cooking_time=60, image="recipes/images/bread.png",
+        )
+        RecipeIngredient.objects.create(
+            recipe=cls.recipe, ingredient=cls.flour, amount=100
+        )
+
+    def test_totals_are_null_when_an_ingredient_lacks_nutrition(self):
+        RecipeIngredient.objects.create(
+            recipe=self.recipe, ingredient=self.salt, amount=5
+        )
+        self.user.shopping_cart_recipes.add(self.recipe)
+
+        recompute_recipe_nutrition([self.recipe.pk])
+
+        nutrition = RecipeNutrition.objects.get(recipe=self.recipe)
+        self.assertIsNone(nutrition.kcal)
+        self.assertIsNone(nutrition.cost)
+        self.assertIsNone(cart_totals(self.user)["kcal"])
+
+    def test_admin_inline_edit_recomputes_nutrition(self):
+        recompute_recipe_nutrition([self.recipe.pk])
+        item = self.recipe.recipe_ingredients.get()
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            f"/admin/api/recipe/{self.recipe.pk}/change/",
+            {
+                "author": self.user.pk,
+                "name": self.recipe.name,
+                "text": self.recipe.text,
+                "cooking_time": self.recipe.cooking_time,
+                "recipe_ingredients-TOTAL_FORMS": 1,
+                "recipe_ingredients-INITIAL_FORMS": 1,
+                "recipe_ingredients-0-id": item.pk,
+                "recipe_ingredients-0-recipe": self.recipe.pk,
+                "recipe_ingredients-0-ingredient": self.flour.pk,
+                "recipe_ingredients-0-amount": 200,
+                "recipe_tags-TOTAL_FORMS": 0,
+                "recipe_tags-INITIAL_FORMS": 0,
+            },
+        )
+
+        self.assertEqual(response.status_code, 302, response.content)
+        self.assertEqual(
+            RecipeNutrition.objects.get(recipe=self.recipe).kcal,
+            Decimal(600),
+        )
@@ -0,0 +1,123 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeSimilarity,
+    ShoppingCartItem,
+    User,
+)
+from api.recommendations import (
+    rebuild_similarities,
+    recommended_recipes,
+    similar_recipes,
+)
+
+
+class RecommendationsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first, cls.second, cls.third = (
+            User.objects.create_user(
+                username=name, email=f"{name}@example.com", password="x",
+            )
+            for name in ("first", "second", "third")
+        )
+        cls.soup, cls.stew, cls.salad, cls.pie = (
+            Recipe.objects.create(
+                author=cls.first, name=name, text="Описание",
+                cooking_time=10, image="recipes/images/dish.png",
+            )
+            for name in ("Суп", "Рагу", "Салат", "Пирог")
+        )
+        onion, carrot, beet, flour = (
+            Ingredient.objects.create(name=name, measurement_unit="г")
+            for name in ("лук", "морковь", "свекла", "мука")
+        )
+        for recipe, ingredients in (
+            (cls.soup, (onion, carrot)),
+            (cls.stew, (carrot, beet)),
+            (cls.salad, (flour,)),
+            (cls.pie, (flour,)),
+        ):
+            for ingredient in ingredients:
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=1
+                )
+        Favorite.objects.create(user=cls.first, recipe=cls.soup)
+        Favorite.objects.create(user=cls.first, recipe=cls.stew)
+        Favorite.objects.create(user=cls.second, recipe=cls.soup)
+        ShoppingCartItem.objects.create(user=cls.second, recipe=cls.stew)
+        ShoppingCartItem.objects.create(user=cls.second, recipe=cls.salad)
+        Favorite.objects.create(user=cls.third, recipe=cls.salad)
+
+    def neighbors(self, recipe):
+        return list(
+            RecipeSimilarity.objects.filter(recipe=recipe)
+            .order_by("-score", "similar_id")
+            .values_list("similar_id", "score")
+        )
+
+    def test_scores_combine_cooccurrence_and_ingredients(self):
+        rebuild_similarities(full=True)
+
+        # Cosine over baskets 1.0 and ingredient Jaccard 1/3.
+        self.assertEqual(self.neighbors(self.soup), [
+            (self.stew.pk, 0.8), (self.salad.pk, 0.35),
+        ])
+        self.assertEqual(self.neighbors(self.pie), [(self.salad.pk, 0.3)])
+        self.assertEqual(
+            list(similar_recipes(self.soup.pk)), [self.stew, self.salad]
+        )
+
+    def test_incremental_run_skips_unchanged_recipes(self):
+        self.assertEqual(rebuild_similarities(), 4)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(rebuild_similarities(), 0)
+        self.assertFalse([
+            query for query in queries
+            if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+        ])
+
+        Favorite.objects.create(user=self.third, recipe=self.pie)
+        self.assertGreater(rebuild_similarities(), 0)
+        self.assertEqual(rebuild_similarities(), 0)
+
+    def test_recommendations_exclude_seen_recipes(self):
+        rebuild_similarities()
+
+        self.assertEqual(recommended_recipes(self.first), [self.salad])
+        self.assertEqual(
+            recommended_recipes(self.third),
+            [self.soup, self.stew, self.pie],
+        )
+
+    def test_endpoints(self):
+        rebuild_similarities()
+        client = APIClient()
+
+        response = client.get(f"/api/recipes/{self.soup.pk}/similar/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [recipe["id"] for recipe in response.json()],
+            [self.stew.pk, self.salad.pk],
+        )
+        self.assertEqual(
+            client.get("/api/recipes/0/similar/").status_code, 404
+        )
+        self.assertEqual(
+            client.get("/api/recipes/recommended/").status_code, 401
+        )
+
+        client.force_authenticate(self.first)
+        response = client.get("/api/recipes/recommended/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [recipe["id"] for recipe in response.json()], [self.salad.pk]
+        )
@@ -0,0 +1,85 @@
+import io
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+DATA = {
+    "name": "Борщ \u2028 \u2029 \"кавычки\" \\ \n",
+    "id": 2 ** 40,
+    "amount": Decimal("1.10"),
+    "score": 0.1,
+    "empty": None,
+    "flags": [True, False],
+    "nested": [{"tags": ()}, {}],
+    "created": datetime(2026, 10, 19, 10, 0, 0, 123456, timezone.utc),
+    "date": date(2026, 10, 19),
+    "uuid": uuid.UUID(int=1),
+}
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def assert_same_output(self, data):
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_matches_drf_output(self):
+        self.assert_same_output(DATA)
+        self.assert_same_output([])
+        self.assert_same_output(None)
+
+    def test_exponents_parse_to_the_same_values(self):
+        data = {"big": 1e16, "small": 1e-7}
+        self.assertEqual(
+            json.loads(FastJSONRenderer().render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
+
+    def test_rejects_non_finite_numbers_like_drf(self):
+        for value in (float("nan"), float("inf"), Decimal("NaN")):
+            with self.subTest(value=value):
+                data = {"score": None, "values": [1, value]}
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render(data)
+                with self.assertRaises(ValueError):
+                    FastJSONRenderer().render(data)
+
+    def test_non_strict_mode_writes_non_finite_numbers_like_drf(self):
+        renderer = FastJSONRenderer()
+        renderer.strict = False
+        data = [float("nan"), float("-inf"), None]
+
+        self.assertEqual(renderer.render(data), b"[NaN,-Infinity,null]")
+
+
+class FastJSONParserTest(SimpleTestCase):
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body))
+
+    def test_matches_drf_parser(self):
+        body = json.dumps({
+            "name": "Борщ \u2028", "id": 2 ** 63, "score": 0.1,
+            "items": [None, True, {"nested": []}],
+        }, ensure_ascii=False).encode()
+
+        self.assertEqual(
+            self.parse(FastJSONParser(), body),
+            self.parse(JSONParser(), body),
+        )
+
+    def test_rejects_what_drf_rejects(self):
+        for body in (b"", b"{", b'{"a": NaN}', b"[Infinity]", b"\xff"):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self.parse(JSONParser(), body)
+                with self.assertRaises(ParseError):
+                    self.parse(FastJSONParser(), body)
@@ -0,0 +1,34 @@
+from django.test import TestCase
+
+from api.models import Recipe, User
+from api.revisions import restore_revision
+from api.serializers import RecipeSerializer
+
+
+class RecipeRevisionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username="author", email="author@example.com", password="x",
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author, name="Черновик", text="Описание",
+            cooking_time=10, image="recipes/images/draft.png",
+        )
+
+    def test_updates_and_restore_number_revisions_in_order(self):
+        for name in ("Пирог", "Пирог с яблоками"):
+            RecipeSerializer().update(
+                Recipe.objects.get(pk=self.recipe.pk), {"name": name}
+            )
+
+        restore_revision(self.recipe, 1)
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.name, "Черновик")
+        self.assertEqual(
+            list(self.recipe.revisions.order_by("number").values_list(
+                "number", "is_snapshot"
+            )),
+            [(1, True), (2, False), (3, False), (4, False)],
+        )
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Recipe, User
+from api.throttling import (
+    ImageUploadThrottle,
+    RecipeLinkThrottle,
+    rejection_counts,
+)
+
+RATES = {"image_upload": "3/minute", "get_link": "1/minute"}
+
+
+class SlidingWindowThrottleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rates = mock.patch.object(ImageUploadThrottle, "THROTTLE_RATES", RATES)
+        rates.start()
+        self.addCleanup(rates.stop)
+        self.now = 600.0
+
+    def allow(self, method="PUT"):
+        throttle = ImageUploadThrottle()
+        throttle.timer = lambda: self.now
+        request = SimpleNamespace(
+            method=method,
+            user=SimpleNamespace(is_authenticated=True, pk=1),
+            META={},
+        )
+        return throttle, throttle.allow_request(request, None)
+
+    def test_rejects_over_limit_without_spending_budget(self):
+        results = [self.allow()[1] for _ in range(5)]
+
+        self.assertEqual(results, [True, True, True, False, False])
+        self.assertEqual(cache.get("throttle_image_upload_1:10"), 3)
+        self.assertEqual(rejection_counts()["image_upload"], 2)
+
+    def test_previous_window_fades_out(self):
+        for _ in range(3):
+            self.allow()
+
+        self.now = 665.0
+        throttle, allowed = self.allow()
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 15)
+
+        self.now = 680.0
+        self.assertTrue(self.allow()[1])
+
+    def test_delete_is_not_an_upload(self):
+        for _ in range(3):
+            self.allow()
+
+        self.assertTrue(self.allow("DELETE")[1])
+        self.assertFalse(self.allow("PATCH")[1])
+
+
+class RetryAfterTest(TestCase):
+    def test_throttled_response_has_retry_after(self):
+        cache.clear()
+        user = User.objects.create_user(
+            username="cook", email="cook@example.com", password="x",
+        )
+        recipe = Recipe.objects.create(
+            author=user, name="Суп", text="Описание",
+            cooking_time=10, image="recipes/images/soup.png",
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        url = f"/api/recipes/{recipe.pk}/get-link/"
+
+        with mock.patch.object(RecipeLinkThrottle, "THROTTLE_RATES", RATES):
+            self.assertEqual(client.get(url).status_code, 200)
+            response = client.get(url)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
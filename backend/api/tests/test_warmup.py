@@ -0,0 +1,29 @@
+import tempfile
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from api.warmup import warm_up
+
+
+class WarmUpTest(TestCase):
+    def test_master_warm_up_opens_no_connections(self):
+        with mock.patch.object(
+            type(caches), "__getitem__",
+            side_effect=AssertionError("cache used before fork"),
+        ), mock.patch("api.warmup.logger") as logger, \
+                self.assertNumQueries(0):
+            timings = warm_up(connect=False)
+
+        logger.exception.assert_not_called()
+        self.assertEqual(set(timings), {"urls", "serializers"})
+
+    def test_worker_warm_up_skips_preloaded_steps(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            INGREDIENTS_SNAPSHOT_ROOT=root
+        ), mock.patch("api.warmup.logger") as logger:
+            timings = warm_up(prepare=False)
+
+        logger.exception.assert_not_called()
+        self.assertEqual(set(timings), {"catalog", "connections"})
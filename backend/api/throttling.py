@@ -0,0 +1,123 @@
+import logging
+
+from django.conf import settings
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
+
+logger = logging.getLogger(__name__)
+
+REJECTIONS_KEY = "throttle:rejected:{scope}"
+
+
+def increment(cache, key, timeout):
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr.
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def rejection_counts():
+    scopes = settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+    counts = SimpleRateThrottle.cache.get_many(
+        [REJECTIONS_KEY.format(scope=scope) for scope in scopes]
+    )
+    return {
+        scope: counts.get(REJECTIONS_KEY.format(scope=scope), 0)
+        for scope in scopes
+    }
+
+
+class SlidingWindowMixin:
+    """Sliding window counter kept in the shared cache.
+
+    Each fixed window has its own counter changed only by atomic add/incr,
+    so concurrent workers can't overshoot the limit; the previous window is
+    weighted by how much of it still overlaps the sliding window.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        self.window, offset = divmod(self.now, self.duration)
+        self.elapsed = offset / self.duration
+        current_key = f"{self.key}:{int(self.window)}"
+        self.current = increment(self.cache, current_key, self.duration * 2)
+        self.previous = self.cache.get(f"{self.key}:{int(self.window) - 1}", 0)
+        if self.previous * (1 - self.elapsed) + self.current \
+                <= self.num_requests:
+            return True
+
+        # Rejected requests don't use up the budget.
+        self.cache.decr(current_key)
+        self.current -= 1
+        return self.throttle_failure()
+
+    def throttle_failure(self):
+        logger.warning(
+            "Throttled %s: %s", self.scope, self.key,
+            extra={"throttle_scope": self.scope},
+        )
+        increment(self.cache, REJECTIONS_KEY.format(scope=self.scope), None)
+        return False
+
+    def wait(self):
+        allowance = self.num_requests - 1
+        if self.current > allowance:
+            # Wait for the next window, then for this one to fade out of it.
+            until = 2 - allowance / self.current
+        else:
+            until = 1 - (allowance - self.current) / self.previous
+        return max(until - self.elapsed, 0) * self.duration
+
+
+class AnonThrottle(SlidingWindowMixin, AnonRateThrottle):
+    pass
+
+
+class UserThrottle(SlidingWindowMixin, UserRateThrottle):
+    pass
+
+
+class ActionThrottle(SlidingWindowMixin, SimpleRateThrottle):
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class ShoppingCartDownloadThrottle(ActionThrottle):
+    scope = "download_shopping_cart"
+
+
+class RecipeLinkThrottle(ActionThrottle):
+    scope = "get_link"
+
+
+class ImageUploadThrottle(ActionThrottle):
+    scope = "image_upload"
+    methods = ("POST", "PUT", "PATCH")
+
+    def allow_request(self, request, view):
+        if request.method not in self.methods:
+            return True
+
+        return super().allow_request(request, view)
+
+
+class ExportThrottle(ActionThrottle):
+    scope = "export"
@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+from django.db.models import (
+    Case,
+    CharField,
+    DecimalField,
+    F,
+    Sum,
+    Value,
+    When,
+)
+
+UNIT_FIELD = "ingredient__measurement_unit"
+
+UNIT_CONVERSIONS = {
+    "кг": ("г", Decimal(1000)),
+    "мг": ("г", Decimal("0.001")),
+    "л": ("мл", Decimal(1000)),
+}
+HUMAN_UNITS = {
+    "г": ("кг", Decimal(1000)),
+    "мл": ("л", Decimal(1000)),
+}
+
+AMOUNT_FIELD = DecimalField(max_digits=20, decimal_places=6)
+AMOUNT_QUANTUM = Decimal("0.01")
+
+
+def canonical_unit(field=UNIT_FIELD):
+    return Case(
+        *(When(**{field: unit}, then=Value(canonical))
+          for unit, (canonical, _) in UNIT_CONVERSIONS.items()),
+        default=F(field),
+        output_field=CharField(),
+    )
+
+
+def canonical_amount(amount=F("amount"), field=UNIT_FIELD):
+    factor = Case(
+        *(When(**{field: unit}, then=Value(factor))
+          for unit, (_, factor) in UNIT_CONVERSIONS.items()),
+        default=Value(Decimal(1)),
+        output_field=AMOUNT_FIELD,
+    )
+    return amount * factor
+
+
+def aggregate_amounts(items, amount=None, prefix=""):
+    unit_field = f"{prefix}{UNIT_FIELD}"
+    amount = amount if amount is not None else F(f"{prefix}amount")
+    return (
+        items.values(
+            name=F(f"{prefix}ingredient__name"),
+            unit=canonical_unit(unit_field),
+        )
+        .annotate(
+            total=Sum(
+                canonical_amount(amount, unit_field),
+                output_field=AMOUNT_FIELD,
+            )
+        )
+        .order_by("name", "unit")
+    )
+
+
+def humanize(amount, unit):
+    amount = Decimal(amount)
+    if unit in HUMAN_UNITS:
+        human_unit, factor = HUMAN_UNITS[unit]
+        if amount >= factor:
+            amount, unit = amount / factor, human_unit
+
+    amount = amount.quantize(AMOUNT_QUANTUM).normalize()
+    return f"{amount:f}", unit
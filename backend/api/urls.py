@@ -2,8 +2,10 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     IngredientViewSet,
+    TagViewSet,
     RecipeViewSet,
     CustomUserViewSet,
+    MealPlanViewSet,
 )
 
 app_name = "api"
@@ -11,7 +13,9 @@ app_name = "api"
 router_api = DefaultRouter()
 router_api.register(r"users", CustomUserViewSet, basename="users")
 router_api.register(r"ingredients", IngredientViewSet, basename="ingredients")
+router_api.register(r"tags", TagViewSet, basename="tags")
 router_api.register(r"recipes", RecipeViewSet, basename="recipes")
+router_api.register(r"meal-plan", MealPlanViewSet, basename="meal-plan")
 
 urlpatterns = [
     path("", include(router_api.urls)),
@@ -1,3 +1,5 @@
+import re
+
 from django.shortcuts import get_object_or_404
 from rest_framework import (
     viewsets,
@@ -8,28 +10,87 @@ from rest_framework import (
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from .models import (
     Ingredient,
     Recipe,
     RecipeIngredient,
+    RecipeNutrition,
     User,
     Follow,
+    OutboxEvent,
+    Tag,
 )
 from .serializers import (
     IngredientSerializer,
+    TagSerializer,
     RecipeSerializer,
+    RecipeListSerializer,
+    RecipeNutritionSerializer,
+    RecipeRevisionSerializer,
+    MealPlanEntrySerializer,
     ShortRecipeSerializer,
     RecipesUserSerializer,
     AvatarSerializer,
 )
-from .filters import RecipeFilter, IngredientFilter
-from django.http import HttpResponse
-from django.db.models import Sum
+from .filters import (
+    RecipeFilter,
+    RecipeOrderingFilter,
+    IngredientFilter,
+    MealPlanFilter,
+)
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.db import transaction
+from django.db.models import Count, F, Max
 from djoser.views import UserViewSet
-from .permissions import DefaultPermission
+from .catalog import (
+    SNAPSHOT_NAME,
+    ensure_catalog_snapshot,
+    get_catalog_version,
+    snapshot_path,
+)
+from .deletion import (
+    delete_files_later,
+    delete_recipes,
+    schedule_user_deletion,
+)
+from .events import record
+from .facets import get_facets, parse_facet_names
+from .export import (
+    READY,
+    export_filename,
+    is_small_export,
+    ready_export,
+    schedule_export,
+    stream_export,
+)
+from .fieldsets import Fieldset
+from .mixins import ConditionalGetMixin
+from .nutrition import cart_totals
+from .permissions import AuthorPermission, DefaultPermission
+from .recommendations import recommended_recipes, similar_recipes
+from .relations import get_embedded_version
+from .revisions import describe_state, reconstruct, restore_revision
+from .stats import author_stats
+from .storage import export_storage
+from .throttling import (
+    ExportThrottle,
+    ImageUploadThrottle,
+    RecipeLinkThrottle,
+    ShoppingCartDownloadThrottle,
+)
+from .units import aggregate_amounts, humanize
+
+IMAGE_UPLOAD_ACTIONS = ("create", "update", "partial_update")
+SNAPSHOT_ENCODING_PREFERENCE = ("br", "gzip")
+DEFAULT_STATS_DAYS = 30
+MAX_STATS_DAYS = 365
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = IngredientSerializer
     queryset = Ingredient.objects.all()
     filterset_class = IngredientFilter
@@ -37,8 +98,47 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.AllowAny]
     pagination_class = None
 
+    def get_list_validators(self, request):
+        version = get_catalog_version()
+        return f"ingredients-{version}", version
+
+    get_detail_validators = get_list_validators
+
+    def get_list_response(self, request, *args, **kwargs):
+        if request.query_params or request.accepted_renderer.format != "json":
+            return super().get_list_response(request, *args, **kwargs)
 
-class RecipeViewSet(viewsets.ModelViewSet):
+        return self._catalog_snapshot(request)
+
+    def _catalog_snapshot(self, request):
+        ensure_catalog_snapshot()
+
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        encoding = next(
+            (encoding for encoding in SNAPSHOT_ENCODING_PREFERENCE
+             if re.search(rf"\b{encoding}\b", accept_encoding)),
+            "identity",
+        )
+
+        response = FileResponse(
+            snapshot_path(encoding).open("rb"),
+            content_type="application/json",
+            filename=SNAPSHOT_NAME,
+        )
+        if encoding != "identity":
+            response["Content-Encoding"] = encoding
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+
+class TagViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = TagSerializer
+    queryset = Tag.objects.all()
+    permission_classes = [permissions.AllowAny]
+    pagination_class = None
+
+
+class RecipeViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = RecipeSerializer
     queryset = Recipe.objects.all()
     permission_classes = [DefaultPermission]
@@ -46,10 +146,111 @@ class RecipeViewSet(viewsets.ModelViewSet):
     filter_backends = (
         DjangoFilterBackend,
         drf_filters.SearchFilter,
-        drf_filters.OrderingFilter,
+        RecipeOrderingFilter,
     )
     search_fields = ("name", "text")
-    ordering_fields = ("name", "pub_date")
+    ordering_fields = ("name", "pub_date", "cooking_time")
+
+    def get_embedded_versions(self):
+        # Authors, tags and ingredient names are embedded in every recipe.
+        return get_embedded_version(), get_catalog_version()
+
+    def get_list_validators(self, request):
+        stats = self.filter_queryset(self.get_queryset()).aggregate(
+            last_modified=Max("updated_at"),
+            count=Count("id"),
+        )
+        last_modified = stats["last_modified"]
+        stamp = last_modified.timestamp() if last_modified else "empty"
+        embedded = self.get_embedded_versions()
+        user_part = self.get_user_etag_part(request)
+        self.list_etag = (f"recipes-{stats['count']}-{stamp}-"
+                          f"{'-'.join(map(str, embedded))}-{user_part}")
+
+        # Favorites, cart, follows and deletions have no modification
+        # time, so a Last-Modified date would let If-Modified-Since
+        # answer 304 after them; only the ETag covers every input.
+        return self.list_etag, None
+
+    def get_detail_validators(self, request):
+        try:
+            last_modified = Recipe.objects.filter(
+                pk=self.kwargs["pk"]
+            ).values_list("updated_at", flat=True).first()
+        except ValueError:
+            return None, None
+
+        if last_modified is None:
+            return None, None
+
+        embedded = self.get_embedded_versions()
+        user_part = self.get_user_etag_part(request)
+        return (f"recipe-{self.kwargs['pk']}-{last_modified.timestamp()}-"
+                f"{'-'.join(map(str, embedded))}-{user_part}", None)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fieldset = Fieldset.from_request(self.request)
+
+        if self.action != "retrieve" or fieldset is None:
+            return queryset
+
+        queryset = queryset.only(*fieldset.only_fields(Recipe, "id"))
+        if "author" in fieldset and not fieldset.is_collapsed("author"):
+            queryset = queryset.select_related("author")
+        if "ingredients" in fieldset:
+            queryset = queryset.prefetch_related(
+                "recipe_ingredients__ingredient"
+            )
+        if "tags" in fieldset:
+            queryset = queryset.prefetch_related("tags")
+        return queryset
+
+    def get_list_response(self, request, *args, **kwargs):
+        try:
+            facet_names = parse_facet_names(
+                request.query_params.get("facets")
+            )
+        except ValueError as error:
+            return Response(
+                {"facets": [str(error)]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fieldset = Fieldset.from_request(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(
+            *RecipeListSerializer.get_values_fields(fieldset)
+        )
+        page = self.paginate_queryset(rows)
+        data = RecipeListSerializer(
+            rows if page is None else page,
+            context=self.get_serializer_context(),
+            fieldset=fieldset,
+        ).data
+
+        if page is None:
+            return Response(data)
+
+        response = self.get_paginated_response(data)
+        response.data["facets"] = get_facets(
+            queryset,
+            facet_names,
+            request.user,
+            self.paginator.page.paginator.count,
+            request.query_params.lists(),
+            getattr(self, "list_etag", None),
+        )
+        return response
+
+    def perform_destroy(self, instance):
+        delete_recipes(Recipe.objects.filter(pk=instance.pk))
+
+    def get_throttles(self):
+        throttles = super().get_throttles()
+        if self.action in IMAGE_UPLOAD_ACTIONS:
+            throttles.append(ImageUploadThrottle())
+        return throttles
 
     def _post_favorite(self, recipe, user):
         if recipe.favorited_by.filter(id=user.id).exists():
@@ -57,7 +258,9 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 {"errors": "Рецепт уже в избранном"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        recipe.favorited_by.add(user)
+        with transaction.atomic():
+            recipe.favorited_by.add(user)
+            record(OutboxEvent.FAVORITE_ADDED, user.id, recipe.id)
         serializer = ShortRecipeSerializer(recipe)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -67,7 +270,9 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 {"errors": "Рецепта нет в избранном"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        recipe.favorited_by.remove(user)
+        with transaction.atomic():
+            recipe.favorited_by.remove(user)
+            record(OutboxEvent.FAVORITE_REMOVED, user.id, recipe.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -102,7 +307,9 @@ class RecipeViewSet(viewsets.ModelViewSet):
                     {"errors": "Рецепт уже добавлен в корзину"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            recipe.in_shopping_cart_for_users.add(user)
+            with transaction.atomic():
+                recipe.in_shopping_cart_for_users.add(user)
+                record(OutboxEvent.SHOPPING_CART_ADDED, user.id, recipe.id)
             serializer = ShortRecipeSerializer(recipe)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -111,24 +318,27 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 {"errors": "Рецепт еще не был добавлен в корзину"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        recipe.in_shopping_cart_for_users.remove(user)
+        with transaction.atomic():
+            recipe.in_shopping_cart_for_users.remove(user)
+            record(OutboxEvent.SHOPPING_CART_REMOVED, user.id, recipe.id)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
         detail=False,
         methods=["get"],
-        permission_classes=[permissions.IsAuthenticated]
+        permission_classes=[permissions.IsAuthenticated],
+        throttle_classes=[
+            *api_settings.DEFAULT_THROTTLE_CLASSES,
+            ShoppingCartDownloadThrottle,
+        ],
     )
     def download_shopping_cart(self, request):
         user = request.user
-        items = (
+        items = aggregate_amounts(
             RecipeIngredient.objects.filter(
                 recipe__in_shopping_cart_for_users=user
             )
-            .values("ingredient__name", "ingredient__measurement_unit")
-            .annotate(total_amount=Sum("amount"))
-            .order_by("ingredient__name")
         )
 
         if not items:
@@ -139,9 +349,18 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         result = ["Список покупок:"]
         for item in items:
-            result.append(f"{item['ingredient__name']} - "
-                          f"{item['ingredient__measurement_unit']}"
-                          f"{item['total_amount']}")
+            amount, unit = humanize(item["total"], item["unit"])
+            result.append(f"{item['name']} - {amount} {unit}")
+
+        totals = cart_totals(user)
+        if totals["kcal"] is not None:
+            result.append("")
+            result.append(f"Калорийность: {totals['kcal']} ккал")
+            result.append(f"Белки: {totals['protein']} г")
+            result.append(f"Жиры: {totals['fat']} г")
+            result.append(f"Углеводы: {totals['carbohydrates']} г")
+        if totals["cost"] is not None:
+            result.append(f"Стоимость: {totals['cost']} ₽")
 
         response_content = "\n".join(result)
         response = HttpResponse(
@@ -154,12 +373,102 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return response
 
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[permissions.AllowAny],
+    )
+    def nutrition(self, request, pk=None):
+        nutrition = get_object_or_404(RecipeNutrition, recipe_id=pk)
+        return Response(RecipeNutritionSerializer(nutrition).data)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[AuthorPermission],
+    )
+    def revisions(self, request, pk=None):
+        recipe = self.get_object()
+        queryset = recipe.revisions.only(
+            "number", "is_snapshot", "created_at"
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = RecipeRevisionSerializer(
+            page if page is not None else queryset, many=True
+        )
+
+        return (Response(serializer.data) if page is None
+                else self.get_paginated_response(serializer.data))
+
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[AuthorPermission],
+        url_path=r"revisions/(?P<number>\d+)",
+        url_name="revision",
+    )
+    def revision(self, request, pk=None, number=None):
+        recipe = self.get_object()
+        state = reconstruct(recipe.pk, int(number))
+        if state is None:
+            return Response(
+                {"errors": "Такой версии нет"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response({"number": int(number), **describe_state(state)})
+
+    @action(
+        detail=True,
+        methods=["post"],
+        permission_classes=[AuthorPermission],
+        url_path=r"revisions/(?P<number>\d+)/restore",
+        url_name="revision-restore",
+    )
+    def restore(self, request, pk=None, number=None):
+        recipe = restore_revision(self.get_object(), int(number))
+        if recipe is None:
+            return Response(
+                {"errors": "Такой версии нет"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        serializer = self.get_serializer(recipe)
+        return Response(serializer.data)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[permissions.AllowAny],
+    )
+    def similar(self, request, pk=None):
+        get_object_or_404(Recipe.objects.only("id"), pk=pk)
+        serializer = ShortRecipeSerializer(
+            similar_recipes(pk), many=True, context={"request": request}
+        )
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def recommended(self, request):
+        serializer = ShortRecipeSerializer(
+            recommended_recipes(request.user),
+            many=True,
+            context={"request": request},
+        )
+        return Response(serializer.data)
+
     @action(
         detail=True,
         methods=["get"],
         permission_classes=[permissions.AllowAny],
         url_path="get-link",
         url_name="recipe-get-link",
+        throttle_classes=[
+            *api_settings.DEFAULT_THROTTLE_CLASSES,
+            RecipeLinkThrottle,
+        ],
     )
     def get_link(self, request, pk=None):
         recipe = get_object_or_404(Recipe, pk=pk)
@@ -180,7 +489,9 @@ class CustomUserViewSet(UserViewSet):
     )
     def subscriptions(self, request):
         user = request.user
-        queryset = User.objects.filter(following__user=user)
+        queryset = self._only_selected(
+            User.objects.filter(following__user=user)
+        )
         page = self.paginate_queryset(queryset)
 
         serializer = RecipesUserSerializer(
@@ -214,7 +525,9 @@ class CustomUserViewSet(UserViewSet):
                     {"errors": "Подписка уже существует"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            Follow.objects.create(user=user, author=author)
+            with transaction.atomic():
+                Follow.objects.create(user=user, author=author)
+                record(OutboxEvent.SUBSCRIBED, user.id, author.id)
             serializer = RecipesUserSerializer(
                 author,
                 context={"request": request}
@@ -226,7 +539,9 @@ class CustomUserViewSet(UserViewSet):
                 {"errors": "Вы еще не были подписаны"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        subscription.delete()
+        with transaction.atomic():
+            subscription.delete()
+            record(OutboxEvent.UNSUBSCRIBED, user.id, author.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def _update_avatar(self, request):
@@ -242,7 +557,11 @@ class CustomUserViewSet(UserViewSet):
 
     def _delete_avatar(self, user):
         if user.avatar:
-            user.avatar.delete()
+            with transaction.atomic():
+                name = user.avatar.name
+                user.avatar = None
+                user.save(update_fields=["avatar"])
+                delete_files_later([name])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -251,6 +570,10 @@ class CustomUserViewSet(UserViewSet):
         permission_classes=[permissions.IsAuthenticated],
         url_path="me/avatar",
         url_name="user-me-avatar",
+        throttle_classes=[
+            *api_settings.DEFAULT_THROTTLE_CLASSES,
+            ImageUploadThrottle,
+        ],
     )
     def avatar(self, request):
         if request.method == "PUT":
@@ -258,9 +581,173 @@ class CustomUserViewSet(UserViewSet):
 
         return self._delete_avatar(request.user)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path="me/stats",
+        url_name="user-me-stats",
+    )
+    def stats(self, request):
+        days = request.query_params.get("days", str(DEFAULT_STATS_DAYS))
+        recipe_id = request.query_params.get("recipe")
+        if not days.isdigit() or not 1 <= int(days) <= MAX_STATS_DAYS:
+            return Response(
+                {"errors": f"days должен быть от 1 до {MAX_STATS_DAYS}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if recipe_id is not None and not recipe_id.isdigit():
+            return Response(
+                {"errors": "recipe должен быть числом"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(author_stats(
+            request.user,
+            int(days),
+            int(recipe_id) if recipe_id is not None else None,
+        ))
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path="me/export",
+        url_name="user-me-export",
+        throttle_classes=[
+            *api_settings.DEFAULT_THROTTLE_CLASSES,
+            ExportThrottle,
+        ],
+    )
+    def export(self, request):
+        user = request.user
+        if is_small_export(user):
+            response = StreamingHttpResponse(
+                stream_export(user), content_type="application/zip"
+            )
+            response["Content-Disposition"] = (
+                f'attachment; filename="{export_filename(user)}"'
+            )
+            return response
+
+        export_status = schedule_export(user)
+        if export_status != READY:
+            return Response(
+                {"status": export_status}, status=status.HTTP_202_ACCEPTED
+            )
+        return Response({
+            "status": READY,
+            "url": request.build_absolute_uri(
+                reverse("api:users-user-me-export-download")
+            ),
+        })
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path="me/export/download",
+        url_name="user-me-export-download",
+    )
+    def export_download(self, request):
+        name = ready_export(request.user)
+        if name is None:
+            return Response(
+                {"errors": "Архив еще не готов"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        if settings.EXPORT_ACCEL_REDIRECT:
+            response = HttpResponse(content_type="application/zip")
+            response["X-Accel-Redirect"] = (
+                settings.EXPORT_ACCEL_REDIRECT + name
+            )
+        else:
+            response = FileResponse(
+                export_storage.open(name), content_type="application/zip"
+            )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{export_filename(request.user)}"'
+        )
+        response["Cache-Control"] = "private, no-store"
+        return response
+
+    def perform_destroy(self, instance):
+        schedule_user_deletion(instance)
+
+    def _only_selected(self, queryset):
+        fieldset = Fieldset.from_request(self.request)
+        if fieldset is None:
+            return queryset
+        return queryset.only(*fieldset.only_fields(User, "id"))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            return self._only_selected(queryset)
+        return queryset
+
     def get_permissions(self):
         self.permission_classes = ([permissions.AllowAny]
                                    if self.action in ["list", "retrieve"]
                                    else [permissions.IsAuthenticated])
 
         return super().get_permissions()
+
+
+class MealPlanViewSet(viewsets.ModelViewSet):
+    serializer_class = MealPlanEntrySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filterset_class = MealPlanFilter
+    filter_backends = [DjangoFilterBackend]
+
+    def get_queryset(self):
+        return self.request.user.meal_plan.select_related("recipe")
+
+    @action(detail=False, methods=["get"])
+    def shopping_list(self, request):
+        entries = self.filter_queryset(self.get_queryset())
+        items = aggregate_amounts(
+            entries,
+            amount=F("recipe__recipe_ingredients__amount") * F("servings"),
+            prefix="recipe__recipe_ingredients__",
+        )
+
+        result = []
+        for item in items:
+            if item["name"] is None:
+                continue
+            amount, unit = humanize(item["total"], item["unit"])
+            result.append({
+                "name": item["name"],
+                "amount": amount,
+                "measurement_unit": unit,
+            })
+
+        return Response(result)
+
+    @action(detail=False, methods=["post"])
+    def apply_to_cart(self, request):
+        entries = self.filter_queryset(self.get_queryset())
+        recipe_ids = set(entries.values_list("recipe_id", flat=True))
+
+        if not recipe_ids:
+            return Response(
+                {"errors": "План питания пуст"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user = request.user
+        with transaction.atomic():
+            added = recipe_ids - set(
+                user.shopping_cart_recipes.filter(
+                    pk__in=recipe_ids
+                ).values_list("pk", flat=True)
+            )
+            user.shopping_cart_recipes.add(*added)
+            for recipe_id in sorted(added):
+                record(OutboxEvent.SHOPPING_CART_ADDED, user.id, recipe_id)
+        return Response(
+            {"recipes": sorted(recipe_ids)},
+            status=status.HTTP_200_OK,
+        )
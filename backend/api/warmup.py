@@ -0,0 +1,102 @@
+import inspect
+import logging
+import time
+
+from django.core.cache import caches, close_caches
+from django.db import connections
+from django.urls import NoReverseMatch, URLPattern, URLResolver, resolve
+from django.urls import reverse
+from rest_framework import serializers as drf_serializers
+
+from . import serializers, urls
+from .catalog import ensure_catalog_snapshot
+
+logger = logging.getLogger(__name__)
+
+URL_KWARG_VALUES = {"format": "json"}
+DEFAULT_URL_KWARG = "1"
+
+
+def _named_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _named_patterns(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern
+
+
+def resolve_urls():
+    resolved = 0
+    for pattern in _named_patterns(urls.urlpatterns):
+        kwargs = {
+            name: URL_KWARG_VALUES.get(name, DEFAULT_URL_KWARG)
+            for name in pattern.pattern.regex.groupindex
+        }
+        try:
+            path = reverse(f"{urls.app_name}:{pattern.name}", kwargs=kwargs)
+        except NoReverseMatch:
+            continue
+        resolve(path)
+        resolved += 1
+    return resolved
+
+
+def build_serializers():
+    built = 0
+    for _, serializer_class in inspect.getmembers(
+        serializers, inspect.isclass
+    ):
+        if (
+            issubclass(serializer_class, drf_serializers.BaseSerializer)
+            and serializer_class.__module__ == serializers.__name__
+        ):
+            serializer_class(context={}).fields
+            built += 1
+    serializers.RecipeListSerializer.get_values_fields()
+    return built
+
+
+def open_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+    caches["default"].get("warmup")
+    return len(connections.all())
+
+
+def close_connections():
+    connections.close_all()
+    close_caches()
+
+
+WARMUP_STEPS = (
+    ("urls", resolve_urls),
+    ("serializers", build_serializers),
+)
+
+# These open database and cache sockets, which a forking master must not
+# hold: every worker would inherit and share them.
+CONNECTED_STEPS = (
+    ("catalog", ensure_catalog_snapshot),
+    ("connections", open_connections),
+)
+
+
+def warm_up(connect=True, prepare=True):
+    timings = {}
+    steps = list(WARMUP_STEPS) if prepare else []
+    if connect:
+        steps += CONNECTED_STEPS
+    for name, step in steps:
+        started = time.monotonic()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+        timings[name] = time.monotonic() - started
+
+    logger.info(
+        "Warm-up finished: %s",
+        ", ".join(f"{name} {seconds * 1000:.1f} ms"
+                  for name, seconds in timings.items()),
+    )
+    return timings
@@ -72,11 +72,32 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', None),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', None),
         'HOST': os.getenv('DB_HOST', None),
-        'PORT': os.getenv('DB_PORT', None)
+        'PORT': os.getenv('DB_PORT', None),
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 60)),
     }
 }
 
 
+# Cache
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "foodgram"),
+    }
+}
+
+SHARED_CACHE_BACKENDS = (
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+)
+# Token, relation and ETag caching must see invalidations made by other
+# gunicorn workers and be cheaper than the query it replaces, so it is
+# only enabled on a network cache.
+SHARED_CACHE = CACHES["default"]["BACKEND"] in SHARED_CACHE_BACKENDS
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -111,6 +132,26 @@ STATIC_ROOT = BASE_DIR / "static"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+DEFAULT_FILE_STORAGE = "api.storage.ContentAddressedStorage"
+
+MEDIA_GC_GRACE_PERIOD = 60 * 60
+
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+
+MAX_IMAGE_PIXELS = 4096 * 4096
+
+RECIPE_SNAPSHOT_INTERVAL = 10
+
+EXPORT_ASYNC_THRESHOLD = 5_000
+EXPORT_ASYNC_MEDIA_SIZE = 50 * 1024 * 1024
+EXPORT_RETENTION = 24 * 60 * 60
+# Archives are private and are never placed under MEDIA_ROOT.
+EXPORT_ROOT = Path(os.getenv("EXPORT_ROOT", BASE_DIR / "exports"))
+# Internal nginx location that serves EXPORT_ROOT, e.g. /protected-exports/.
+EXPORT_ACCEL_REDIRECT = os.getenv("EXPORT_ACCEL_REDIRECT", "")
+
+INGREDIENTS_SNAPSHOT_ROOT = MEDIA_ROOT / "catalog"
+
 AUTH_USER_MODEL = "api.User"
 
 REST_FRAMEWORK = {
@@ -118,12 +159,58 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
     "DEFAULT_PAGINATION_CLASS": "api.pagination.DefaultPagination",
     "PAGE_SIZE": 6,
+    "DEFAULT_THROTTLE_CLASSES": [
+        "api.throttling.AnonThrottle",
+        "api.throttling.UserThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": os.getenv("THROTTLE_ANON_RATE", "120/minute"),
+        "user": os.getenv("THROTTLE_USER_RATE", "300/minute"),
+        "download_shopping_cart": "10/minute",
+        "get_link": "30/minute",
+        "image_upload": "30/hour",
+        "export": "10/hour",
+    },
 }
 
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.getenv("AUTH_TOKEN_CACHE_TIMEOUT", 300))
+
+RELATIONS_CACHE_TIMEOUT = int(os.getenv("RELATIONS_CACHE_TIMEOUT", 600))
+
+FACETS_CACHE_TIMEOUT = int(os.getenv("FACETS_CACHE_TIMEOUT", 300))
+
+BACKGROUND_DELETE_THRESHOLD = 5_000
+
+RECOMMENDATIONS_TOP_K = int(os.getenv("RECOMMENDATIONS_TOP_K", 20))
+
+JOB_WORKER_PROCESSES = int(os.getenv("JOB_WORKER_PROCESSES", 2))
+JOB_POLL_INTERVAL = 1.0
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 30
+JOB_HEARTBEAT_INTERVAL = 30
+JOB_STALE_TIMEOUT = 5 * 60
+JOB_MAINTENANCE_INTERVAL = 60
+JOB_RETENTION_DAYS = 7
+
+OUTBOX_BATCH_SIZE = 500
+OUTBOX_POLL_INTERVAL = 1.0
+OUTBOX_GAP_TIMEOUT = 5 * 60
+OUTBOX_MAX_RETRY_DELAY = 60
+OUTBOX_RETENTION_DAYS = 30
+
 DJOSER = {
     "PASSWORD_RESET_CONFIRM_URL": "#/password/reset/confirm/{uid}/{token}",
     "USERNAME_RESET_CONFIRM_URL": "#/username/reset/confirm/{uid}/{token}",
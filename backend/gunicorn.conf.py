@@ -0,0 +1,44 @@
+import multiprocessing
+import os
+import time
+
+bind = os.getenv("GUNICORN_BIND", "0:8000")
+workers = int(
+    os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+started = time.monotonic()
+
+
+def on_starting(server):
+    # With preload_app the application is already imported here, so the
+    # warmed resolvers and serializer caches are shared with the workers.
+    if preload_app:
+        from api.warmup import close_connections, warm_up
+
+        warm_up(connect=False)
+        close_connections()
+    server.log.info(
+        "Application loaded in %.2f s", time.monotonic() - started
+    )
+
+
+def pre_fork(server, worker):
+    # A connection opened in the master must never be shared by workers.
+    if preload_app:
+        from api.warmup import close_connections
+
+        close_connections()
+
+
+def post_worker_init(worker):
+    from api.warmup import warm_up
+
+    worker_started = time.monotonic()
+    warm_up(prepare=not preload_app)
+    worker.log.info(
+        "Worker %s ready in %.2f s (%.2f s since master start)",
+        worker.pid, time.monotonic() - worker_started,
+        time.monotonic() - started,
+    )